@@ -0,0 +1,34 @@
+"""Add indexes for foreign-key lookups and ordered listings
+
+Revision ID: 0001_add_lookup_indexes
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+
+revision = "0001_add_lookup_indexes"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Tables predate migrations (they are created by Base.metadata.create_all),
+# and new databases get these indexes from the models, hence if_not_exists
+def upgrade():
+    op.create_index(
+        "ix_sections_project_id_order", "sections",
+        ["project_id", "order"], if_not_exists=True
+    )
+    op.create_index(
+        "ix_refinement_history_section_id_created_at", "refinement_history",
+        ["section_id", "created_at"], if_not_exists=True
+    )
+    op.create_index(
+        "ix_projects_user_id_updated_at", "projects",
+        ["user_id", "updated_at"], if_not_exists=True
+    )
+
+def downgrade():
+    op.drop_index("ix_projects_user_id_updated_at", table_name="projects", if_exists=True)
+    op.drop_index("ix_refinement_history_section_id_created_at", table_name="refinement_history", if_exists=True)
+    op.drop_index("ix_sections_project_id_order", table_name="sections", if_exists=True)
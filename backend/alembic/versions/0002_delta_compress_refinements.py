@@ -0,0 +1,107 @@
+"""Store refinement history as deltas against periodic keyframes
+
+Revision ID: 0002_delta_compress_refinements
+Revises: 0001_add_lookup_indexes
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.services.revision_store import revision_store
+from app.utils.delta import apply_delta, decompress_text
+
+revision = "0002_delta_compress_refinements"
+down_revision = "0001_add_lookup_indexes"
+branch_labels = None
+depends_on = None
+
+refinements = sa.table(
+    "refinement_history",
+    sa.column("id", sa.Integer),
+    sa.column("section_id", sa.Integer),
+    sa.column("previous_content", sa.Text),
+    sa.column("new_content", sa.Text),
+    sa.column("snapshot", sa.LargeBinary),
+    sa.column("previous_delta", sa.LargeBinary),
+    sa.column("new_delta", sa.LargeBinary),
+    sa.column("keyframe_id", sa.Integer),
+)
+
+def _columns(bind):
+    return {column["name"] for column in sa.inspect(bind).get_columns("refinement_history")}
+
+def _section_ids(bind):
+    return bind.execute(
+        sa.select(refinements.c.section_id).distinct().order_by(refinements.c.section_id)
+    ).scalars().all()
+
+def upgrade():
+    bind = op.get_bind()
+    # Databases created by create_all after this change already have the new layout
+    if "snapshot" in _columns(bind):
+        return
+    
+    with op.batch_alter_table("refinement_history") as batch:
+        batch.add_column(sa.Column("snapshot", sa.LargeBinary(), nullable=True))
+        batch.add_column(sa.Column("previous_delta", sa.LargeBinary(), nullable=True))
+        batch.add_column(sa.Column("new_delta", sa.LargeBinary(), nullable=True))
+        batch.add_column(sa.Column("keyframe_id", sa.Integer(), nullable=True))
+        batch.create_foreign_key(
+            "fk_refinement_history_keyframe_id", "refinement_history", ["keyframe_id"], ["id"]
+        )
+    
+    # One section at a time keeps memory flat on large tables
+    for section_id in _section_ids(bind):
+        rows = bind.execute(
+            sa.select(refinements.c.id, refinements.c.previous_content, refinements.c.new_content)
+            .where(refinements.c.section_id == section_id)
+            .order_by(refinements.c.id)
+        ).all()
+        keyframe = keyframe_text = None
+        for index, row in enumerate(rows):
+            if index % revision_store.keyframe_interval == 0:
+                keyframe, keyframe_text = row.id, row.new_content or ""
+                keyframe_id = None
+                values = revision_store.encode(row.previous_content, row.new_content)
+            else:
+                keyframe_id = keyframe
+                values = revision_store.encode(row.previous_content, row.new_content, keyframe_text)
+            bind.execute(
+                refinements.update().where(refinements.c.id == row.id).values(
+                    keyframe_id=keyframe_id, **values
+                )
+            )
+    
+    with op.batch_alter_table("refinement_history") as batch:
+        batch.drop_column("previous_content")
+        batch.drop_column("new_content")
+
+def downgrade():
+    bind = op.get_bind()
+    with op.batch_alter_table("refinement_history") as batch:
+        batch.add_column(sa.Column("previous_content", sa.Text(), nullable=True))
+        batch.add_column(sa.Column("new_content", sa.Text(), nullable=True))
+    
+    for section_id in _section_ids(bind):
+        rows = bind.execute(
+            sa.select(
+                refinements.c.id, refinements.c.keyframe_id, refinements.c.snapshot,
+                refinements.c.previous_delta, refinements.c.new_delta
+            ).where(refinements.c.section_id == section_id)
+        ).all()
+        snapshots = {row.id: decompress_text(row.snapshot) for row in rows if row.keyframe_id is None}
+        for row in rows:
+            base = snapshots[row.keyframe_id or row.id]
+            bind.execute(
+                refinements.update().where(refinements.c.id == row.id).values(
+                    previous_content=apply_delta(base, row.previous_delta),
+                    new_content=apply_delta(base, row.new_delta)
+                )
+            )
+    
+    with op.batch_alter_table("refinement_history") as batch:
+        batch.drop_constraint("fk_refinement_history_keyframe_id", type_="foreignkey")
+        batch.drop_column("keyframe_id")
+        batch.drop_column("new_delta")
+        batch.drop_column("previous_delta")
+        batch.drop_column("snapshot")
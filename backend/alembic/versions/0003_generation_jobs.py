@@ -0,0 +1,56 @@
+"""Add the generation_jobs table with job leases
+
+Revision ID: 0003_generation_jobs
+Revises: 0002_delta_compress_refinements
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_generation_jobs"
+down_revision = "0002_delta_compress_refinements"
+branch_labels = None
+depends_on = None
+
+def _lease_columns():
+    return [
+        sa.Column("owner", sa.String(), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(), nullable=True),
+    ]
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    # create_all may already have made the table, with or without leases
+    if inspector.has_table("generation_jobs"):
+        columns = {column["name"] for column in inspector.get_columns("generation_jobs")}
+        if "owner" not in columns:
+            with op.batch_alter_table("generation_jobs") as batch:
+                for column in _lease_columns():
+                    batch.add_column(column)
+        return
+    
+    op.create_table(
+        "generation_jobs",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column(
+            "status",
+            sa.Enum("QUEUED", "RUNNING", "COMPLETED", "FAILED", name="jobstatus"),
+            nullable=False
+        ),
+        sa.Column("strategy", sa.String(), nullable=False),
+        sa.Column("max_concurrency", sa.Integer(), nullable=True),
+        sa.Column("total_sections", sa.Integer(), nullable=True),
+        sa.Column("completed_sections", sa.Integer(), nullable=True),
+        sa.Column("section_status", sa.JSON(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        *_lease_columns(),
+        sa.Column("project_id", sa.Integer(), sa.ForeignKey("projects.id"), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+    )
+
+def downgrade():
+    op.drop_table("generation_jobs")
+    sa.Enum(name="jobstatus").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,29 @@
+"""Index projects for listings ordered by creation time
+
+Revision ID: 0004_page_projects_by_created_at
+Revises: 0003_generation_jobs
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+
+revision = "0004_page_projects_by_created_at"
+down_revision = "0003_generation_jobs"
+branch_labels = None
+depends_on = None
+
+# Project listings page on (created_at, id) instead of updated_at, which
+# moves rows between pages whenever a project is edited
+def upgrade():
+    op.create_index(
+        "ix_projects_user_id_created_at", "projects",
+        ["user_id", "created_at"], if_not_exists=True
+    )
+    op.drop_index("ix_projects_user_id_updated_at", table_name="projects", if_exists=True)
+
+def downgrade():
+    op.create_index(
+        "ix_projects_user_id_updated_at", "projects",
+        ["user_id", "updated_at"], if_not_exists=True
+    )
+    op.drop_index("ix_projects_user_id_created_at", table_name="projects", if_exists=True)
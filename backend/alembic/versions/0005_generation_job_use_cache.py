@@ -0,0 +1,26 @@
+"""Remember whether a generation job may read the response cache
+
+Revision ID: 0005_generation_job_use_cache
+Revises: 0004_page_projects_by_created_at
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_generation_job_use_cache"
+down_revision = "0004_page_projects_by_created_at"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("generation_jobs")}
+    # create_all may already have added it
+    if "use_cache" in columns:
+        return
+    with op.batch_alter_table("generation_jobs") as batch:
+        batch.add_column(sa.Column("use_cache", sa.Boolean(), nullable=False, server_default=sa.true()))
+
+def downgrade():
+    with op.batch_alter_table("generation_jobs") as batch:
+        batch.drop_column("use_cache")
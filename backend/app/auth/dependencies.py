@@ -1,16 +1,45 @@
+from dataclasses import dataclass
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import event, inspect
 from sqlalchemy.orm import Session
+from app.config import get_settings
 from app.db.database import get_db
 from app.models import User
+from app.utils.cache import TTLCache
 from app.utils.security import decode_token
 
+settings = get_settings()
 security = HTTPBearer()
 
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as routes see it; no ORM session attached"""
+    id: int
+    email: str
+    username: str
+
+# Keyed by token subject (the user's email)
+_principal_cache = TTLCache(
+    max_entries=settings.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+def invalidate_principal(email: str) -> None:
+    _principal_cache.delete(email)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target: User):
+    history = inspect(target).attrs.email.history
+    for email in (target.email, *history.deleted):
+        if email:
+            invalidate_principal(email)
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-) -> User:
+) -> Principal:
     token = credentials.credentials
     payload = decode_token(token)
     
@@ -27,11 +56,17 @@ def get_current_user(
             detail="Invalid authentication credentials"
         )
     
-    user = db.query(User).filter(User.email == email).first()
+    principal = _principal_cache.get(email)
+    if principal is not None:
+        return principal
+    
+    user = db.query(User.id, User.email, User.username).filter(User.email == email).first()
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
     
-    return user
+    principal = Principal(id=user.id, email=user.email, username=user.username)
+    _principal_cache.set(email, principal)
+    return principal
@@ -1,14 +1,102 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Fraction of DB_POOL_SIZE/DB_MAX_OVERFLOW given to the async engine; the
+    # sync engine gets the rest so both together stay within one budget
+    DB_ASYNC_POOL_SHARE: float = 0.5
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+    AUTH_PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    
+    # Password hashing
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 256
     OPENAI_API_KEY: str
     
+    # OpenAI HTTP client pool
+    OPENAI_TIMEOUT: float = 60.0
+    OPENAI_CONNECT_TIMEOUT: float = 10.0
+    OPENAI_MAX_CONNECTIONS: int = 200
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 50
+    OPENAI_KEEPALIVE_EXPIRY: float = 30.0
+    
+    # API availability checks
+    AI_STARTUP_TIMEOUT: float = 3.0
+    AI_HEALTH_CHECK_TIMEOUT: float = 5.0
+    AI_HEALTH_CHECK_INTERVAL: float = 30.0
+    
+    # Model response cache; the SQLite tier is off unless a path is given
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_MAX_ENTRIES: int = 1024
+    AI_CACHE_TTL_SECONDS: int = 86400
+    AI_CACHE_SQLITE_PATH: Optional[str] = None
+    AI_CACHE_SQLITE_MAX_ENTRIES: int = 100000
+    
+    # Model call retries (rate limits, timeouts, 5xx) and per-model circuit breaker
+    AI_RETRY_MAX_ATTEMPTS: int = 3
+    AI_RETRY_BASE_DELAY: float = 0.5
+    AI_RETRY_MAX_DELAY: float = 20.0
+    AI_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    AI_CIRCUIT_RESET_SECONDS: float = 30.0
+    
+    # Model call scheduling: global token budget, concurrency and per-user queue depth
+    MODEL_TOKENS_PER_MINUTE: int = 90000
+    MODEL_MAX_CONCURRENCY: int = 32
+    MODEL_USER_QUEUE_LIMIT: int = 16
+    
+    # Section generation fan-out
+    GENERATION_MAX_CONCURRENCY: int = 4
+    
+    # Rendered export cache; defaults to a directory under the system temp dir
+    EXPORT_CACHE_ENABLED: bool = True
+    EXPORT_CACHE_DIR: Optional[str] = None
+    EXPORT_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    
+    # Document rendering ("process", "thread" or "inline")
+    RENDER_EXECUTOR: str = "process"
+    RENDER_WORKERS: int = 2
+    RENDER_MAX_QUEUE: int = 8
+    # Address-space limit per render process in MB (process mode, not on
+    # Windows); exports that need more get a 413. Workers need ~100 to start
+    RENDER_WORKER_MAX_MEMORY_MB: Optional[int] = None
+    
+    # Background generation jobs ("memory" or "database")
+    JOB_BACKEND: str = "memory"
+    JOB_WORKERS: int = 2
+    JOB_EVENTS_POLL_INTERVAL: float = 0.5
+    # A job whose worker stops renewing its lease for this long is resumed
+    # by another worker
+    JOB_LEASE_SECONDS: float = 30
+    # Finished jobs the memory backend keeps for clients to read
+    JOB_MEMORY_TTL_SECONDS: float = 3600
+    JOB_MEMORY_MAX_FINISHED: int = 1000
+    
+    # Refinement history stores a full snapshot every N revisions per section
+    REFINEMENT_KEYFRAME_INTERVAL: int = 10
+    
+    # Prometheus metrics at /metrics (per worker process)
+    METRICS_ENABLED: bool = True
+    
+    # Logging: "json" or "text"; LOG_LEVELS and LOG_SAMPLE_RATES take
+    # comma-separated name=value pairs, e.g. "uvicorn.access=0.1"
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_LEVELS: str = ""
+    LOG_SAMPLE_RATES: str = ""
+    LOG_QUEUE_SIZE: int = 10000
+    
     class Config:
         env_file = ".env"
 
@@ -1,11 +1,50 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from typing import Dict, Optional, Tuple
+from sqlalchemy.pool import Pool
 from app.config import get_settings
 
 settings = get_settings()
 
-engine = create_engine(settings.DATABASE_URL)
+def _split(total: int, share: float) -> Tuple[int, int]:
+    async_part = round(total * share)
+    return total - async_part, async_part
+
+def _pool_options(url: str, kind: str) -> dict:
+    """Pool arguments for the "sync" or "async" engine.
+
+    DB_POOL_SIZE and DB_MAX_OVERFLOW are the budget for the whole worker, split
+    between the two engines by DB_ASYNC_POOL_SHARE.
+    """
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    # SQLite uses its own single-file pools that reject sizing arguments
+    if not make_url(url).get_backend_name() == "sqlite":
+        index = 0 if kind == "sync" else 1
+        pool_size = _split(settings.DB_POOL_SIZE, settings.DB_ASYNC_POOL_SHARE)[index]
+        max_overflow = _split(settings.DB_MAX_OVERFLOW, settings.DB_ASYNC_POOL_SHARE)[index]
+        options.update(
+            # QueuePool treats pool_size=0 as unbounded, so keep at least one
+            pool_size=max(pool_size, 1),
+            max_overflow=max_overflow,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE
+        )
+    return options
+
+def _async_url(url: str) -> str:
+    """Map the sync DATABASE_URL onto the matching asyncio driver"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "postgresql":
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+    elif backend == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed.render_as_string(hide_password=False)
+
+engine = create_engine(settings.DATABASE_URL, **_pool_options(settings.DATABASE_URL, "sync"))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -16,3 +55,42 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# The async engine is built on first use so the asyncpg/aiosqlite driver is
+# only imported by workers that actually serve async routes
+_async_engine: Optional[AsyncEngine] = None
+_AsyncSessionLocal: Optional[async_sessionmaker] = None
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        url = _async_url(settings.DATABASE_URL)
+        _async_engine = create_async_engine(url, **_pool_options(url, "async"))
+        _AsyncSessionLocal = async_sessionmaker(
+            bind=_async_engine,
+            autoflush=False,
+            expire_on_commit=False
+        )
+    return _async_engine
+
+def AsyncSessionLocal() -> AsyncSession:
+    get_async_engine()
+    return _AsyncSessionLocal()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def dispose_async_engine():
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _AsyncSessionLocal = None
+
+def engine_pools() -> Dict[str, Pool]:
+    """Connection pools this worker has opened, for metrics"""
+    pools = {"sync": engine.pool}
+    if _async_engine is not None:
+        pools["async"] = _async_engine.sync_engine.pool
+    return pools
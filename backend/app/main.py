@@ -1,23 +1,71 @@
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from app.routes import auth, projects, sections, generate, refine, export
-from app.db.database import engine, Base
+from app.db.database import engine, Base, dispose_async_engine
 from app.config import get_settings
-import traceback
+from app.services.ai_service import ai_service
+from app.services.job_service import job_service
+from app.services.ai_errors import AIServiceError
+from app.services.render_executor import render_executor
+from app.services.metrics import registry, MetricsMiddleware
+from app.utils.metrics import CONTENT_TYPE
+from app.utils.logs import configure_logging, RequestIdMiddleware
+from contextlib import asynccontextmanager
+import logging
+import math
 
 settings = get_settings()
+configure_logging(
+    level=settings.LOG_LEVEL,
+    log_format=settings.LOG_FORMAT,
+    levels=settings.LOG_LEVELS,
+    sample_rates=settings.LOG_SAMPLE_RATES,
+    queue_size=settings.LOG_QUEUE_SIZE
+)
+logger = logging.getLogger(__name__)
 Base.metadata.create_all(bind=engine)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await ai_service.start()
+    await job_service.start()
+    render_executor.start()
+    yield
+    render_executor.shutdown()
+    await job_service.stop()
+    await ai_service.close()
+    await dispose_async_engine()
+
 app = FastAPI(
     title="DocuGen AI API",
     description="AI-powered document generation platform",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+@app.exception_handler(AIServiceError)
+async def ai_service_error_handler(request: Request, exc: AIServiceError):
+    headers = {}
+    if exc.retry_after is not None:
+        headers["Retry-After"] = str(max(1, math.ceil(exc.retry_after)))
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": str(exc)},
+        headers=headers
+    )
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
-    traceback.print_exc()
+    logger.error(
+        "Unhandled error",
+        exc_info=exc,
+        extra={
+            "request_id": getattr(request.state, "request_id", None),
+            "method": request.method,
+            "path": request.url.path
+        }
+    )
     return JSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={"detail": "Internal server error"}
@@ -35,8 +83,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Retry-After", "X-Request-ID"],
 )
 
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Outermost, so everything logged while handling a request carries its id
+app.add_middleware(RequestIdMiddleware)
+
 app.include_router(auth.router)
 app.include_router(projects.router)
 app.include_router(sections.router)
@@ -55,4 +110,9 @@ def root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
+    return {"status": "healthy", "ai_enabled": ai_service.enabled}
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return Response(registry.render(), media_type=CONTENT_TYPE)
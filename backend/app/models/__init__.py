@@ -2,5 +2,9 @@ from app.models.user import User
 from app.models.project import Project, DocumentType
 from app.models.section import Section
 from app.models.refinement import RefinementHistory
+from app.models.job import GenerationJob, JobStatus
 
-__all__ = ["User", "Project", "Section", "RefinementHistory", "DocumentType"]
+__all__ = [
+    "User", "Project", "Section", "RefinementHistory", "DocumentType",
+    "GenerationJob", "JobStatus"
+]
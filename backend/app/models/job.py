@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum, JSON, true
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.db.database import Base
+import enum
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class GenerationJob(Base):
+    __tablename__ = "generation_jobs"
+    
+    id = Column(String, primary_key=True)
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.QUEUED)
+    strategy = Column(String, nullable=False)
+    max_concurrency = Column(Integer, nullable=True)
+    use_cache = Column(Boolean, nullable=False, default=True, server_default=true())
+    total_sections = Column(Integer, default=0)
+    completed_sections = Column(Integer, default=0)
+    section_status = Column(JSON, default=dict)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # App worker currently running the job, and when others may take it over
+    owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    
+    project = relationship("Project", back_populates="jobs")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.database import Base
@@ -11,6 +11,12 @@ class DocumentType(str, enum.Enum):
 class Project(Base):
     __tablename__ = "projects"
     
+    __table_args__ = (
+        # Listings page on creation time, which unlike updated_at never
+        # changes while a client is paging
+        Index("ix_projects_user_id_created_at", "user_id", "created_at"),
+    )
+    
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     document_type = Column(Enum(DocumentType), nullable=False)
@@ -21,3 +27,4 @@ class Project(Base):
     
     owner = relationship("User", back_populates="projects")
     sections = relationship("Section", back_populates="project", cascade="all, delete-orphan")
+    jobs = relationship("GenerationJob", back_populates="project", cascade="all, delete-orphan")
@@ -1,18 +1,51 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.database import Base
+from app.utils.delta import apply_delta, decompress_text
 
 class RefinementHistory(Base):
+    """One refinement of a section.
+
+    Content is stored delta-compressed: every few revisions of a section a
+    keyframe row keeps a compressed ``snapshot`` of its new content, and each
+    row stores ``previous_delta``/``new_delta`` against its keyframe's text.
+    ``previous_content`` and ``new_content`` reconstruct the full texts.
+    """
     __tablename__ = "refinement_history"
     
+    __table_args__ = (
+        Index("ix_refinement_history_section_id_created_at", "section_id", "created_at"),
+    )
+    
     id = Column(Integer, primary_key=True, index=True)
     prompt = Column(Text, nullable=False)
-    previous_content = Column(Text)
-    new_content = Column(Text)
+    snapshot = Column(LargeBinary)
+    previous_delta = Column(LargeBinary)
+    new_delta = Column(LargeBinary)
     liked = Column(Boolean, default=None, nullable=True)
     comment = Column(Text, default="")
     created_at = Column(DateTime, default=datetime.utcnow)
     section_id = Column(Integer, ForeignKey("sections.id"), nullable=False)
+    # NULL on keyframes themselves
+    keyframe_id = Column(
+        Integer,
+        ForeignKey("refinement_history.id", name="fk_refinement_history_keyframe_id"),
+        nullable=True
+    )
     
     section = relationship("Section", back_populates="refinements")
+    keyframe = relationship("RefinementHistory", remote_side=[id])
+    
+    def _base_text(self) -> str:
+        if self.keyframe_id is None:
+            return decompress_text(self.snapshot)
+        return decompress_text(self.keyframe.snapshot)
+    
+    @property
+    def previous_content(self) -> str:
+        return apply_delta(self._base_text(), self.previous_delta)
+    
+    @property
+    def new_content(self) -> str:
+        return apply_delta(self._base_text(), self.new_delta)
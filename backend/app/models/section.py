@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.database import Base
@@ -6,6 +6,10 @@ from app.db.database import Base
 class Section(Base):
     __tablename__ = "sections"
     
+    __table_args__ = (
+        Index("ix_sections_project_id_order", "project_id", "order"),
+    )
+    
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     content = Column(Text, default="")
@@ -1,28 +1,34 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.db.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_async_db
 from app.models import User
 from app.schemas import UserCreate, UserLogin, Token, UserResponse
 from app.utils.security import (
-    verify_password,
-    get_password_hash,
+    hash_password_async,
+    verify_and_update_password_async,
+    PasswordHasherBusy,
     create_access_token,
     create_refresh_token,
     decode_token
 )
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
+logger = logging.getLogger(__name__)
+
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy, please retry shortly",
+        headers={"Retry-After": "1"}
+    )
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
-    print(f"📝 Registration attempt:")
-    print(f"   Email: {user_data.email}")
-    print(f"   Username: {user_data.username}")
-    print(f"   Password length: {len(user_data.password)} chars, {len(user_data.password.encode('utf-8'))} bytes")
-    
-    existing_user = db.query(User).filter(
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    existing_user = (await db.execute(select(User).where(
         (User.email == user_data.email) | (User.username == user_data.username)
-    ).first()
+    ).limit(1))).scalar_one_or_none()
     
     if existing_user:
         raise HTTPException(
@@ -30,9 +36,10 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
             detail="Email or username already registered"
         )
     
-    print(f"   Hashing password...")
-    hashed_password = get_password_hash(user_data.password)
-    print(f"   ✅ Password hashed successfully")
+    try:
+        hashed_password = await hash_password_async(user_data.password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
     
     new_user = User(
         email=user_data.email,
@@ -41,22 +48,38 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
-    print(f"   ✅ User created successfully")
+    logger.info("User registered", extra={"user_id": new_user.id})
     return new_user
 
 @router.post("/login", response_model=Token)
-def login(user_data: UserLogin, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == user_data.email).first()
+async def login(user_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    user = (await db.execute(select(User).where(
+        User.email == user_data.email
+    ))).scalar_one_or_none()
     
-    if not user or not verify_password(user_data.password, user.hashed_password):
+    valid, new_hash = False, None
+    if user:
+        try:
+            valid, new_hash = await verify_and_update_password_async(
+                user_data.password, user.hashed_password
+            )
+        except PasswordHasherBusy:
+            raise _hasher_busy()
+    
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
     
+    # Stored hash used a different bcrypt cost; upgrade it transparently
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+    
     access_token = create_access_token(data={"sub": user.email})
     refresh_token = create_refresh_token(data={"sub": user.email})
     
@@ -67,7 +90,7 @@ def login(user_data: UserLogin, db: Session = Depends(get_db)):
     }
 
 @router.post("/refresh", response_model=Token)
-def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
+async def refresh_token(refresh_token: str, db: AsyncSession = Depends(get_async_db)):
     payload = decode_token(refresh_token)
     
     if payload is None or payload.get("type") != "refresh":
@@ -77,7 +100,7 @@ def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
         )
     
     email = payload.get("sub")
-    user = db.query(User).filter(User.email == email).first()
+    user = (await db.execute(select(User).where(User.email == email))).scalar_one_or_none()
     
     if not user:
         raise HTTPException(
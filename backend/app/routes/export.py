@@ -1,23 +1,111 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from app.db.database import get_db
-from app.models import User, Project, Section
-from app.auth.dependencies import get_current_user
-from app.services.document_service import document_service
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import re
+from app.db.database import get_async_db
+from app.models import Project, Section
+from app.auth.dependencies import get_current_user, Principal
+from app.services.document_service import PPTX_THEMES, DEFAULT_PPTX_THEME
+from app.services.export_cache import export_cache
+from app.services.metrics import EXPORTS
+from app.services.render_executor import render_executor, snapshot, RenderQueueFull, RenderUnavailable
+from app.utils.responses import OpenFileResponse
 
 router = APIRouter(prefix="/export", tags=["Export"])
 
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+PPTX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+_ENTITY_TAG_RE = re.compile(r'(?:W/)?("[^"]*")')
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match comparison: ``*`` or any listed tag, weak or strong"""
+    if if_none_match.strip() == "*":
+        return True
+    return etag in _ENTITY_TAG_RE.findall(if_none_match)
+
+async def _export_response(
+    request: Request,
+    project: Project,
+    sections: List[Section],
+    file_format: str,
+    media_type: str,
+    theme: Optional[str] = None
+):
+    key = export_cache.digest(project, sections, file_format, theme)
+    etag = f'"{key}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache"
+    }
+    
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    filename = f"{project.title.replace(' ', '_')}.{file_format}"
+    headers["Content-Disposition"] = f"attachment; filename={filename}"
+    
+    cached = await export_cache.open(key, file_format)
+    EXPORTS.inc(format=file_format, cache="miss" if cached is None else "hit")
+    if cached is not None:
+        return OpenFileResponse(cached, media_type=media_type, headers=headers)
+    
+    # Render into a file rather than memory, then stream it out in chunks
+    tmp_path = export_cache.reserve(file_format)
+    try:
+        await render_executor.render(file_format, snapshot(project, sections, theme), tmp_path)
+    except RenderQueueFull:
+        export_cache.discard(tmp_path)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many exports in progress, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
+    except RenderUnavailable:
+        export_cache.discard(tmp_path)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Export rendering is temporarily unavailable, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
+    except MemoryError:
+        export_cache.discard(tmp_path)
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Document is too large to export"
+        )
+    except BaseException:
+        export_cache.discard(tmp_path)
+        raise
+    
+    cached = await export_cache.commit(key, file_format, tmp_path)
+    if cached is None:
+        # Not cached: stream the temp file and delete it once it is sent or
+        # the client goes away
+        return OpenFileResponse(
+            open(tmp_path, "rb"),
+            media_type=media_type,
+            headers=headers,
+            on_close=lambda: export_cache.discard(tmp_path)
+        )
+    return OpenFileResponse(cached, media_type=media_type, headers=headers)
+
+@router.get("/themes")
+def list_themes():
+    return {"themes": list(PPTX_THEMES), "default": DEFAULT_PPTX_THEME}
+
 @router.get("/{project_id}/docx")
-def export_docx(
+async def export_docx(
     project_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    project = db.query(Project).filter(
+    project = (await db.execute(select(Project).where(
         Project.id == project_id,
         Project.user_id == current_user.id
-    ).first()
+    ))).scalar_one_or_none()
     
     if not project:
         raise HTTPException(
@@ -31,30 +119,24 @@ def export_docx(
             detail="Project is not a Word document"
         )
     
-    sections = db.query(Section).filter(
+    sections = (await db.execute(select(Section).where(
         Section.project_id == project.id
-    ).order_by(Section.order).all()
-    
-    buffer = document_service.create_docx(project, sections)
-    
-    filename = f"{project.title.replace(' ', '_')}.docx"
+    ).order_by(Section.order))).scalars().all()
     
-    return StreamingResponse(
-        buffer,
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
+    return await _export_response(request, project, sections, "docx", DOCX_MEDIA_TYPE)
 
 @router.get("/{project_id}/pptx")
-def export_pptx(
+async def export_pptx(
     project_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    theme: str = Query(DEFAULT_PPTX_THEME),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    project = db.query(Project).filter(
+    project = (await db.execute(select(Project).where(
         Project.id == project_id,
         Project.user_id == current_user.id
-    ).first()
+    ))).scalar_one_or_none()
     
     if not project:
         raise HTTPException(
@@ -68,16 +150,14 @@ def export_pptx(
             detail="Project is not a PowerPoint presentation"
         )
     
-    sections = db.query(Section).filter(
-        Section.project_id == project.id
-    ).order_by(Section.order).all()
-    
-    buffer = document_service.create_pptx(project, sections)
+    if theme not in PPTX_THEMES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown theme. Available themes: {', '.join(PPTX_THEMES)}"
+        )
     
-    filename = f"{project.title.replace(' ', '_')}.pptx"
+    sections = (await db.execute(select(Section).where(
+        Section.project_id == project.id
+    ).order_by(Section.order))).scalars().all()
     
-    return StreamingResponse(
-        buffer,
-        media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
+    return await _export_response(request, project, sections, "pptx", PPTX_MEDIA_TYPE, theme)
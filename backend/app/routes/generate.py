@@ -1,17 +1,76 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.database import get_db
-from app.models import User, Project, Section
-from app.schemas import GenerateContentRequest, AIOutlineRequest
-from app.auth.dependencies import get_current_user
+from app.db.database import get_db, get_async_db, AsyncSessionLocal
+from app.models import Project, Section
+from app.schemas import (
+    GenerateContentRequest, AIOutlineRequest, AIOutlineBatchRequest, AIOutlineBatchResponse,
+    GenerationJobResponse
+)
+from app.auth.dependencies import get_current_user, Principal
 from app.services.ai_service import ai_service
+from app.services.generation_service import generation_service
+from app.services.ai_errors import AIServiceError
+from app.services.model_scheduler import model_scheduler
+from app.services.job_service import job_service, job_progress
+from app.utils.sse import format_sse
 
 router = APIRouter(prefix="/generate", tags=["AI Generation"])
 
 @router.post("/content")
 async def generate_content(
     request: GenerateContentRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    project = (await db.execute(select(Project).where(
+        Project.id == request.project_id,
+        Project.user_id == current_user.id
+    ))).scalar_one_or_none()
+    
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    sections = (await db.execute(select(Section).where(
+        Section.project_id == project.id
+    ).order_by(Section.order))).scalars().all()
+    
+    if not sections:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No sections found in project"
+        )
+    
+    # Hand the connection back while the model runs; expire_on_commit=False
+    # keeps the loaded rows usable and the write below opens a new transaction
+    await db.commit()
+    
+    contents = await generation_service.generate_sections(
+        main_topic=project.main_topic,
+        document_type=project.document_type.value,
+        section_titles=[section.title for section in sections],
+        strategy=request.strategy,
+        max_concurrency=request.max_concurrency,
+        use_cache=not request.bypass_cache,
+        user_id=current_user.id
+    )
+    
+    for section, content in zip(sections, contents):
+        section.content = content
+    
+    await db.commit()
+    
+    return {"message": "Content generated successfully", "project_id": project.id}
+
+@router.post("/content/stream")
+def stream_content(
+    request: GenerateContentRequest,
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     project = db.query(Project).filter(
@@ -35,31 +94,154 @@ async def generate_content(
             detail="No sections found in project"
         )
     
-    context = ""
-    for section in sections:
-        content = await ai_service.generate_section_content(
-            main_topic=project.main_topic,
-            section_title=section.title,
-            document_type=project.document_type.value,
-            context=context
-        )
+    # Refuse up front; once the stream has started the status is already 200
+    model_scheduler.admit(current_user.id)
+    
+    main_topic = project.main_topic
+    document_type = project.document_type.value
+    outline = [(section.id, section.order, section.title) for section in sections]
+    user_id = current_user.id
+    
+    async def event_stream():
+        # Sections are streamed one after another so each keeps the
+        # previous sections as context, and saved as soon as they close
+        context = ""
+        for section_id, order, title in outline:
+            yield format_sse({"section_id": section_id, "order": order, "title": title}, event="section_start")
+            
+            parts = []
+            try:
+                async for delta in ai_service.stream_section_content(
+                    main_topic=main_topic,
+                    section_title=title,
+                    document_type=document_type,
+                    context=context,
+                    use_cache=not request.bypass_cache,
+                    user_id=user_id
+                ):
+                    parts.append(delta)
+                    yield format_sse({"section_id": section_id, "delta": delta}, event="delta")
+            except AIServiceError as e:
+                yield format_sse(
+                    {"section_id": section_id, "detail": str(e), "status_code": e.status_code,
+                     "retry_after": e.retry_after},
+                    event="error"
+                )
+                return
+            
+            content = "".join(parts)
+            async with AsyncSessionLocal() as stream_db:
+                await stream_db.execute(
+                    update(Section).where(Section.id == section_id).values(content=content)
+                )
+                await stream_db.commit()
+            
+            context += f"\n{title}: {content[:200]}..."
+            yield format_sse({"section_id": section_id}, event="section_done")
         
-        section.content = content
-        context += f"\n{section.title}: {content[:200]}..."
+        yield format_sse({"project_id": request.project_id}, event="done")
     
-    db.commit()
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/jobs", response_model=GenerationJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_generation_job(
+    request: GenerateContentRequest,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    project = (await db.execute(select(Project).where(
+        Project.id == request.project_id,
+        Project.user_id == current_user.id
+    ))).scalar_one_or_none()
     
-    return {"message": "Content generated successfully", "project_id": project.id}
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    section_ids = (await db.execute(select(Section.id).where(
+        Section.project_id == project.id
+    ).order_by(Section.order))).scalars().all()
+    
+    if not section_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No sections found in project"
+        )
+    
+    return await job_service.submit(
+        project_id=project.id,
+        user_id=current_user.id,
+        section_ids=section_ids,
+        strategy=request.strategy,
+        max_concurrency=request.max_concurrency,
+        use_cache=not request.bypass_cache
+    )
+
+async def _get_user_job(job_id: str, current_user: Principal) -> dict:
+    job = await job_service.get(job_id)
+    
+    if not job or job["user_id"] != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    return job
+
+@router.get("/jobs/{job_id}", response_model=GenerationJobResponse)
+async def get_generation_job(
+    job_id: str,
+    current_user: Principal = Depends(get_current_user)
+):
+    return await _get_user_job(job_id, current_user)
+
+@router.get("/jobs/{job_id}/events")
+async def stream_generation_job(
+    job_id: str,
+    current_user: Principal = Depends(get_current_user)
+):
+    await _get_user_job(job_id, current_user)
+    
+    async def event_stream():
+        async for job in job_service.watch(job_id):
+            yield format_sse(job_progress(job), event="progress")
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.post("/outline")
 async def generate_outline(
     request: AIOutlineRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     titles = await ai_service.generate_outline(
         main_topic=request.main_topic,
         document_type=request.document_type,
-        num_sections=request.num_sections or 5
+        num_sections=request.num_sections or 5,
+        use_cache=not request.bypass_cache,
+        user_id=current_user.id
     )
     
     return {"titles": titles}
+
+@router.post("/outline/batch", response_model=AIOutlineBatchResponse)
+async def generate_outline_batch(
+    request: AIOutlineBatchRequest,
+    current_user: Principal = Depends(get_current_user)
+):
+    results = await generation_service.generate_outlines(
+        request.requests,
+        max_concurrency=request.max_concurrency,
+        user_id=current_user.id
+    )
+    
+    return AIOutlineBatchResponse(results=results)
@@ -1,55 +1,88 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import List, Optional
 from app.db.database import get_db
-from app.models import User, Project, Section
-from app.schemas import ProjectCreate, ProjectUpdate, ProjectResponse
-from app.auth.dependencies import get_current_user
+from app.models import Project, Section
+from app.schemas import ProjectCreate, ProjectUpdate, ProjectResponse, ProjectSummaryResponse
+from app.auth.dependencies import get_current_user, Principal
+from app.utils.pagination import keyset_paginate
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
 @router.post("", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
 def create_project(
     project_data: ProjectCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    new_project = Project(
-        title=project_data.title,
-        document_type=project_data.document_type,
-        main_topic=project_data.main_topic,
-        user_id=current_user.id
-    )
+    """Insert the project and all of its sections in a single transaction"""
+    new_project = db.scalars(
+        insert(Project).returning(Project),
+        [{
+            "title": project_data.title,
+            "document_type": project_data.document_type,
+            "main_topic": project_data.main_topic,
+            "user_id": current_user.id
+        }]
+    ).one()
     
-    db.add(new_project)
-    db.commit()
-    db.refresh(new_project)
-    
-    for section_data in project_data.sections:
-        section = Section(
-            title=section_data.title,
-            order=section_data.order,
-            project_id=new_project.id
-        )
-        db.add(section)
+    sections = []
+    if project_data.sections:
+        sections = db.scalars(
+            insert(Section).returning(Section),
+            [
+                {
+                    "title": section_data.title,
+                    "order": section_data.order,
+                    "project_id": new_project.id
+                }
+                for section_data in project_data.sections
+            ]
+        ).all()
     
+    # RETURNING already gave us every column, so populate the relationship
+    # directly and serialize before commit expires the instances
+    set_committed_value(new_project, "sections", sorted(sections, key=lambda x: x.order))
+    response = ProjectResponse.model_validate(new_project)
     db.commit()
-    db.refresh(new_project)
     
-    return new_project
+    return response
 
 @router.get("", response_model=List[ProjectResponse])
 def get_projects(
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    query = db.query(Project).options(
+        selectinload(Project.sections)
+    ).filter(Project.user_id == current_user.id)
+    
+    return keyset_paginate(query, response, limit, cursor, Project.created_at, Project.id)
+
+@router.get("/summary", response_model=List[ProjectSummaryResponse])
+def get_project_summaries(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    projects = db.query(Project).filter(Project.user_id == current_user.id).all()
-    return projects
+    """Same listing as GET /projects without section bodies"""
+    query = db.query(Project).options(
+        selectinload(Project.sections).defer(Section.content)
+    ).filter(Project.user_id == current_user.id)
+    
+    return keyset_paginate(query, response, limit, cursor, Project.created_at, Project.id)
 
 @router.get("/{project_id}", response_model=ProjectResponse)
 def get_project(
     project_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     project = db.query(Project).filter(
@@ -69,7 +102,7 @@ def get_project(
 def update_project(
     project_id: int,
     project_data: ProjectUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     project = db.query(Project).filter(
@@ -96,7 +129,7 @@ def update_project(
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_project(
     project_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     project = db.query(Project).filter(
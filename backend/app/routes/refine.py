@@ -1,24 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.db.database import get_db
-from app.models import User, Project, Section, RefinementHistory
-from app.schemas import RefinementCreate, RefinementFeedback, RefinementResponse
-from app.auth.dependencies import get_current_user
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, defer, selectinload
+from typing import List, Optional
+from app.db.database import get_db, get_async_db, AsyncSessionLocal
+from app.models import Project, Section, RefinementHistory
+from app.schemas import (
+    RefinementCreate, RefinementFeedback, RefinementResponse, RefinementSummaryResponse
+)
+from app.auth.dependencies import get_current_user, Principal
 from app.services.ai_service import ai_service
+from app.services.ai_errors import AIServiceError
+from app.services.model_scheduler import model_scheduler
+from app.services.revision_store import revision_store
+from app.utils.pagination import keyset_paginate
+from app.utils.sse import format_sse
 
 router = APIRouter(prefix="/refine", tags=["Refinement"])
 
 @router.post("", response_model=RefinementResponse)
 async def refine_section(
     refinement_data: RefinementCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    section = db.query(Section).join(Project).filter(
+    section = (await db.execute(select(Section).join(Project).where(
         Section.id == refinement_data.section_id,
         Project.user_id == current_user.id
-    ).first()
+    ))).scalar_one_or_none()
     
     if not section:
         raise HTTPException(
@@ -27,32 +37,102 @@ async def refine_section(
         )
     
     previous_content = section.content
+    # Hand the connection back while the model runs; the revision is written
+    # in a fresh transaction once it returns
+    await db.commit()
     
     new_content = await ai_service.refine_content(
         current_content=previous_content,
         refinement_prompt=refinement_data.prompt,
-        section_title=section.title
+        section_title=section.title,
+        use_cache=not refinement_data.bypass_cache,
+        user_id=current_user.id
     )
     
-    refinement = RefinementHistory(
+    refinement = await revision_store.add(
+        db,
+        section_id=section.id,
         prompt=refinement_data.prompt,
         previous_content=previous_content,
-        new_content=new_content,
-        section_id=section.id
+        new_content=new_content
     )
-    
-    db.add(refinement)
     section.content = new_content
-    db.commit()
-    db.refresh(refinement)
+    await db.commit()
     
     return refinement
 
+@router.post("/stream")
+def stream_refine_section(
+    refinement_data: RefinementCreate,
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    section = db.query(Section).join(Project).filter(
+        Section.id == refinement_data.section_id,
+        Project.user_id == current_user.id
+    ).first()
+    
+    if not section:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Section not found"
+        )
+    
+    # Refuse up front; once the stream has started the status is already 200
+    model_scheduler.admit(current_user.id)
+    
+    section_id = section.id
+    section_title = section.title
+    previous_content = section.content
+    user_id = current_user.id
+    
+    async def event_stream():
+        parts = []
+        try:
+            async for delta in ai_service.stream_refined_content(
+                current_content=previous_content,
+                refinement_prompt=refinement_data.prompt,
+                section_title=section_title,
+                use_cache=not refinement_data.bypass_cache,
+                user_id=user_id
+            ):
+                parts.append(delta)
+                yield format_sse({"delta": delta}, event="delta")
+        except AIServiceError as e:
+            yield format_sse(
+                {"detail": str(e), "status_code": e.status_code, "retry_after": e.retry_after},
+                event="error"
+            )
+            return
+        
+        new_content = "".join(parts)
+        async with AsyncSessionLocal() as stream_db:
+            refinement = await revision_store.add(
+                stream_db,
+                section_id=section_id,
+                prompt=refinement_data.prompt,
+                previous_content=previous_content,
+                new_content=new_content
+            )
+            await stream_db.execute(
+                update(Section).where(Section.id == section_id).values(content=new_content)
+            )
+            await stream_db.commit()
+            result = RefinementResponse.model_validate(refinement).model_dump(mode="json")
+        
+        yield format_sse(result, event="done")
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.put("/{refinement_id}/feedback", response_model=RefinementResponse)
 def update_refinement_feedback(
     refinement_id: int,
     feedback: RefinementFeedback,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     refinement = db.query(RefinementHistory).join(Section).join(Project).filter(
@@ -76,25 +156,76 @@ def update_refinement_feedback(
     
     return refinement
 
+def _get_owned_section(db: Session, section_id: int, user_id: int) -> Section:
+    section = db.query(Section).join(Project).filter(
+        Section.id == section_id,
+        Project.user_id == user_id
+    ).first()
+    
+    if not section:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Section not found"
+        )
+    
+    return section
+
 @router.get("/section/{section_id}", response_model=List[RefinementResponse])
 def get_section_refinements(
     section_id: int,
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    section = db.query(Section).join(Project).filter(
-        Section.id == section_id,
+    _get_owned_section(db, section_id, current_user.id)
+    
+    query = db.query(RefinementHistory).options(
+        selectinload(RefinementHistory.keyframe)
+    ).filter(RefinementHistory.section_id == section_id)
+    
+    return keyset_paginate(
+        query, response, limit, cursor, RefinementHistory.created_at, RefinementHistory.id
+    )
+
+@router.get("/section/{section_id}/summary", response_model=List[RefinementSummaryResponse])
+def get_section_refinement_summaries(
+    section_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Same listing as GET /refine/section/{id} without the content bodies"""
+    _get_owned_section(db, section_id, current_user.id)
+    
+    query = db.query(RefinementHistory).options(
+        defer(RefinementHistory.snapshot),
+        defer(RefinementHistory.previous_delta),
+        defer(RefinementHistory.new_delta)
+    ).filter(RefinementHistory.section_id == section_id)
+    
+    return keyset_paginate(
+        query, response, limit, cursor, RefinementHistory.created_at, RefinementHistory.id
+    )
+
+@router.get("/{refinement_id}", response_model=RefinementResponse)
+def get_refinement(
+    refinement_id: int,
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    refinement = db.query(RefinementHistory).join(Section).join(Project).filter(
+        RefinementHistory.id == refinement_id,
         Project.user_id == current_user.id
     ).first()
     
-    if not section:
+    if not refinement:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Section not found"
+            detail="Refinement not found"
         )
     
-    refinements = db.query(RefinementHistory).filter(
-        RefinementHistory.section_id == section_id
-    ).order_by(RefinementHistory.created_at.desc()).all()
-    
-    return refinements
+    return refinement
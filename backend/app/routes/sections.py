@@ -1,16 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.db.database import get_db
-from app.models import User, Project, Section
+from app.models import Project, Section
 from app.schemas import SectionUpdate, SectionResponse
-from app.auth.dependencies import get_current_user
+from app.auth.dependencies import get_current_user, Principal
 
 router = APIRouter(prefix="/sections", tags=["Sections"])
 
 @router.get("/{section_id}", response_model=SectionResponse)
 def get_section(
     section_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     section = db.query(Section).join(Project).filter(
@@ -30,7 +30,7 @@ def get_section(
 def update_section(
     section_id: int,
     section_data: SectionUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     section = db.query(Section).join(Project).filter(
@@ -59,7 +59,7 @@ def update_section(
 @router.delete("/{section_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_section(
     section_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     section = db.query(Section).join(Project).filter(
@@ -1,17 +1,21 @@
 from app.schemas.user import UserCreate, UserLogin, UserResponse, Token, TokenData
 from app.schemas.project import (
-    ProjectCreate, ProjectUpdate, ProjectResponse,
-    SectionCreate, SectionUpdate, SectionResponse
+    ProjectCreate, ProjectUpdate, ProjectResponse, ProjectSummaryResponse,
+    SectionCreate, SectionUpdate, SectionResponse, SectionSummaryResponse
 )
 from app.schemas.refinement import (
-    RefinementCreate, RefinementFeedback, RefinementResponse,
-    GenerateContentRequest, AIOutlineRequest
+    RefinementCreate, RefinementFeedback, RefinementResponse, RefinementSummaryResponse,
+    GenerateContentRequest, AIOutlineRequest, AIOutlineBatchRequest, AIOutlineResult,
+    AIOutlineBatchResponse, GenerationStrategy
 )
+from app.schemas.job import GenerationJobResponse
 
 __all__ = [
     "UserCreate", "UserLogin", "UserResponse", "Token", "TokenData",
-    "ProjectCreate", "ProjectUpdate", "ProjectResponse",
-    "SectionCreate", "SectionUpdate", "SectionResponse",
-    "RefinementCreate", "RefinementFeedback", "RefinementResponse",
-    "GenerateContentRequest", "AIOutlineRequest"
+    "ProjectCreate", "ProjectUpdate", "ProjectResponse", "ProjectSummaryResponse",
+    "SectionCreate", "SectionUpdate", "SectionResponse", "SectionSummaryResponse",
+    "RefinementCreate", "RefinementFeedback", "RefinementResponse", "RefinementSummaryResponse",
+    "GenerateContentRequest", "AIOutlineRequest", "AIOutlineBatchRequest", "AIOutlineResult",
+    "AIOutlineBatchResponse", "GenerationStrategy",
+    "GenerationJobResponse"
 ]
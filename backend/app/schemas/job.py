@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Dict, Optional
+from app.models.job import JobStatus
+
+class GenerationJobResponse(BaseModel):
+    id: str
+    project_id: int
+    status: JobStatus
+    strategy: str
+    total_sections: int
+    completed_sections: int
+    section_status: Dict[str, str] = {}
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
@@ -25,6 +25,15 @@ class SectionResponse(SectionBase):
     class Config:
         from_attributes = True
 
+class SectionSummaryResponse(SectionBase):
+    id: int
+    project_id: int
+    created_at: datetime
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
+
 class ProjectCreate(BaseModel):
     title: str
     document_type: DocumentType
@@ -47,3 +56,16 @@ class ProjectResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+class ProjectSummaryResponse(BaseModel):
+    id: int
+    title: str
+    document_type: DocumentType
+    main_topic: str
+    created_at: datetime
+    updated_at: datetime
+    user_id: int
+    sections: List[SectionSummaryResponse] = []
+    
+    class Config:
+        from_attributes = True
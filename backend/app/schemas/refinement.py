@@ -1,10 +1,12 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+import enum
 
 class RefinementCreate(BaseModel):
     prompt: str
     section_id: int
+    bypass_cache: bool = False
 
 class RefinementFeedback(BaseModel):
     liked: Optional[bool] = None
@@ -23,10 +25,41 @@ class RefinementResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class RefinementSummaryResponse(BaseModel):
+    id: int
+    prompt: str
+    liked: Optional[bool]
+    comment: str
+    created_at: datetime
+    section_id: int
+    
+    class Config:
+        from_attributes = True
+
+class GenerationStrategy(str, enum.Enum):
+    SEQUENTIAL = "sequential"
+    CONCURRENT = "concurrent"
+    OUTLINE = "outline"
+
 class GenerateContentRequest(BaseModel):
     project_id: int
+    strategy: GenerationStrategy = GenerationStrategy.SEQUENTIAL
+    max_concurrency: Optional[int] = Field(default=None, ge=1)
+    bypass_cache: bool = False
 
 class AIOutlineRequest(BaseModel):
     main_topic: str
     document_type: str
     num_sections: Optional[int] = 5
+    bypass_cache: bool = False
+
+class AIOutlineBatchRequest(BaseModel):
+    requests: List[AIOutlineRequest] = Field(min_length=1, max_length=100)
+    max_concurrency: Optional[int] = Field(default=None, ge=1)
+
+class AIOutlineResult(BaseModel):
+    titles: Optional[List[str]] = None
+    error: Optional[str] = None
+
+class AIOutlineBatchResponse(BaseModel):
+    results: List[AIOutlineResult]
@@ -0,0 +1,104 @@
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+import httpx
+import openai
+
+class AIServiceError(Exception):
+    """A model call that could not produce content.
+
+    ``status_code`` is what the API answers with, ``retryable`` says whether
+    the same call may succeed if repeated, and ``fallback_allowed`` whether
+    trying the next model is worthwhile.
+    """
+    status_code = 502
+    retryable = False
+    fallback_allowed = False
+    # Counts towards opening the model's circuit breaker
+    trips_circuit = False
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class AIDisabledError(AIServiceError):
+    status_code = 503
+
+class AIAuthError(AIServiceError):
+    """Our API key was rejected or has no quota left; retrying will not help"""
+    status_code = 503
+
+class AIBadRequestError(AIServiceError):
+    status_code = 502
+
+class AIModelUnavailableError(AIServiceError):
+    status_code = 503
+    fallback_allowed = True
+
+class CircuitOpenError(AIModelUnavailableError):
+    pass
+
+class AIRateLimitError(AIServiceError):
+    # Falling back to another model on 429 would only double the load
+    status_code = 429
+    retryable = True
+
+class AITimeoutError(AIServiceError):
+    status_code = 504
+    retryable = True
+    fallback_allowed = True
+    trips_circuit = True
+
+class AIUpstreamError(AIServiceError):
+    status_code = 502
+    retryable = True
+    fallback_allowed = True
+    trips_circuit = True
+
+def _retry_after(response: Optional[httpx.Response]) -> Optional[float]:
+    if response is None:
+        return None
+    value = response.headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def classify(exc: Exception, model: str) -> AIServiceError:
+    """Map an OpenAI client exception onto the typed failures above"""
+    if isinstance(exc, AIServiceError):
+        return exc
+    if isinstance(exc, openai.APITimeoutError):
+        return AITimeoutError(f"{model} timed out")
+    if isinstance(exc, openai.APIConnectionError):
+        return AIUpstreamError(f"Could not reach the AI provider for {model}")
+    if isinstance(exc, openai.RateLimitError):
+        if getattr(exc, "code", None) == "insufficient_quota":
+            return AIAuthError("AI provider quota exhausted")
+        return AIRateLimitError(f"{model} is rate limited", retry_after=_retry_after(exc.response))
+    if isinstance(exc, openai.AuthenticationError):
+        return AIAuthError("AI provider rejected the API key")
+    if isinstance(exc, (openai.PermissionDeniedError, openai.NotFoundError)):
+        return AIModelUnavailableError(f"{model} is not available to this account")
+    if isinstance(exc, (openai.BadRequestError, openai.UnprocessableEntityError)):
+        return AIBadRequestError(f"{model} rejected the request")
+    if isinstance(exc, openai.APIStatusError):
+        if exc.status_code >= 500 or exc.status_code == 409:
+            return AIUpstreamError(
+                f"{model} failed with status {exc.status_code}",
+                retry_after=_retry_after(exc.response)
+            )
+        return AIBadRequestError(f"{model} failed with status {exc.status_code}")
+    return AIUpstreamError(f"{model} call failed: {type(exc).__name__}")
@@ -1,33 +1,216 @@
-from openai import OpenAI
+from openai import AsyncOpenAI
 from app.config import get_settings
-from typing import List
+from app.services.ai_errors import AIDisabledError, AIServiceError, classify
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.metrics import (
+    MODEL_ERRORS, MODEL_FALLBACKS, MODEL_REQUEST_DURATION, MODEL_RETRIES, MODEL_TOKENS
+)
+from app.services.model_scheduler import model_scheduler, Priority
+from app.services.response_cache import response_cache
+from typing import AsyncIterator, Dict, List, Optional
+import asyncio
+import httpx
+import logging
+import random
+import time
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 class AIService:
     def __init__(self):
+        # No network I/O here: the module is imported at worker start and the
+        # client is only built once an event loop is running (see start())
+        self.client: Optional[AsyncOpenAI] = None
+        self.enabled = False
+        self._health_task: Optional[asyncio.Task] = None
+        self._breakers: Dict[str, CircuitBreaker] = {}
+    
+    def _get_client(self) -> AsyncOpenAI:
+        if self.client is None:
+            self.client = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                http_client=self._build_http_client(),
+                timeout=self._timeout(settings.OPENAI_TIMEOUT),
+                # Retries are classified and paced by _retry_delay instead
+                max_retries=0
+            )
+        return self.client
+    
+    async def check_health(self) -> bool:
+        """Probe the API and enable or disable the service accordingly"""
         try:
-            self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
-            self.client.models.list()
+            await self._get_client().models.list(
+                timeout=self._timeout(settings.AI_HEALTH_CHECK_TIMEOUT)
+            )
+            if not self.enabled:
+                logger.info("OpenAI API available")
             self.enabled = True
-            print("OpenAI API configured")
         except Exception as e:
-            print(f"OpenAI API error: {e}")
-            self.client = None
+            if self.enabled or self._health_task is None:
+                logger.warning("OpenAI API unavailable", extra={"error": str(e)})
             self.enabled = False
+        return self.enabled
     
-    async def generate_section_content(
+    async def start(self):
+        """Run the first health check within the startup budget, then keep
+        re-checking in the background so the service recovers on its own"""
+        try:
+            await asyncio.wait_for(self.check_health(), timeout=settings.AI_STARTUP_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning("OpenAI API check timed out; retrying in background")
+        self._health_task = asyncio.create_task(self._health_loop())
+    
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(settings.AI_HEALTH_CHECK_INTERVAL)
+            if not self.enabled:
+                await self.check_health()
+    
+    @staticmethod
+    def _timeout(total: float) -> httpx.Timeout:
+        return httpx.Timeout(total, connect=settings.OPENAI_CONNECT_TIMEOUT)
+    
+    @staticmethod
+    def _build_http_client() -> httpx.AsyncClient:
+        """Shared connection pool for every model call made by this worker"""
+        return httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY
+            ),
+            timeout=AIService._timeout(settings.OPENAI_TIMEOUT)
+        )
+    
+    async def close(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+    
+    async def _chat_completion(
         self,
+        model: str,
+        system_message: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+        timeout: Optional[float] = None,
+        use_cache: bool = True,
+        user_id: Optional[int] = None,
+        priority: Priority = Priority.BULK
+    ) -> str:
+        cache_key = response_cache.make_key(model, system_message, prompt, temperature, max_tokens)
+        if use_cache:
+            cached = await response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        tokens = model_scheduler.estimate_tokens(system_message, prompt, max_tokens=max_tokens)
+        breaker = self._breaker(model)
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                # Checked before queueing so an open circuit never holds a slot or tokens
+                breaker.before_call()
+                async with model_scheduler.slot(user_id, priority, tokens) as reservation:
+                    started = time.perf_counter()
+                    try:
+                        response = await self._get_client().chat.completions.create(
+                            model=model,
+                            messages=[
+                                {"role": "system", "content": system_message},
+                                {"role": "user", "content": prompt}
+                            ],
+                            temperature=temperature,
+                            max_tokens=max_tokens,
+                            timeout=self._timeout(timeout or settings.OPENAI_TIMEOUT)
+                        )
+                    except Exception as e:
+                        # A failed call reports no usage; give the reserved tokens back
+                        reservation.settle(0)
+                        MODEL_REQUEST_DURATION.observe(time.perf_counter() - started, model=model, outcome="error")
+                        raise self._record_failure(breaker, e, model) from e
+                    MODEL_REQUEST_DURATION.observe(time.perf_counter() - started, model=model, outcome="success")
+                    breaker.record_success()
+                    if response.usage is not None:
+                        reservation.settle(response.usage.total_tokens)
+                        MODEL_TOKENS.inc(response.usage.prompt_tokens, model=model, type="prompt")
+                        MODEL_TOKENS.inc(response.usage.completion_tokens, model=model, type="completion")
+                break
+            except AIServiceError as error:
+                MODEL_ERRORS.inc(model=model, error=type(error).__name__)
+                delay = self._retry_delay(error, attempt)
+                self._log_failure(model, error, attempt, delay)
+                if delay is None:
+                    raise
+            MODEL_RETRIES.inc(model=model)
+            await asyncio.sleep(delay)
+        
+        content = response.choices[0].message.content
+        await response_cache.set(cache_key, content)
+        return content
+    
+    def _breaker(self, model: str) -> CircuitBreaker:
+        if model not in self._breakers:
+            self._breakers[model] = CircuitBreaker(
+                model,
+                failure_threshold=settings.AI_CIRCUIT_FAILURE_THRESHOLD,
+                reset_seconds=settings.AI_CIRCUIT_RESET_SECONDS
+            )
+        return self._breakers[model]
+    
+    def circuit_breakers(self) -> Dict[str, CircuitBreaker]:
+        return dict(self._breakers)
+    
+    @staticmethod
+    def _record_failure(breaker: CircuitBreaker, exc: Exception, model: str) -> AIServiceError:
+        error = classify(exc, model)
+        if error.trips_circuit:
+            breaker.record_failure()
+        else:
+            # The model answered, even if it refused this particular call
+            breaker.record_success()
+        return error
+    
+    @staticmethod
+    def _log_failure(model: str, error: AIServiceError, attempt: int, delay: Optional[float]):
+        fields = {"model": model, "error": type(error).__name__, "detail": str(error), "attempt": attempt}
+        if delay is None:
+            logger.warning("Model call failed", extra=fields)
+        else:
+            logger.info("Retrying model call", extra={**fields, "retry_in": round(delay, 2)})
+    
+    @staticmethod
+    def _retry_delay(error: AIServiceError, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying, or None to give up"""
+        if not error.retryable or attempt >= settings.AI_RETRY_MAX_ATTEMPTS:
+            return None
+        # Exponential backoff with full jitter, but never sooner than the
+        # provider asked for; a longer wait than we allow is left to the client
+        delay = random.uniform(0, min(
+            settings.AI_RETRY_MAX_DELAY,
+            settings.AI_RETRY_BASE_DELAY * 2 ** (attempt - 1)
+        ))
+        if error.retry_after is not None:
+            if error.retry_after > settings.AI_RETRY_MAX_DELAY:
+                return None
+            delay = max(delay, error.retry_after)
+        return delay
+    
+    @staticmethod
+    def _section_prompt(
         main_topic: str,
         section_title: str,
         document_type: str,
         context: str = ""
     ) -> str:
-        if not self.enabled:
-            return "AI generation is disabled. Please configure a valid OpenAI API key."
-        
         if document_type == "docx":
-            prompt = f"""Write professional content for a business document about: {main_topic}
+            return f"""Write professional content for a business document about: {main_topic}
 
 Section: {section_title}
 {f"Context: {context}" if context else ""}
@@ -39,7 +222,7 @@ Requirements:
 - Include relevant examples or data
 - Clear transitions between ideas"""
         else:
-            prompt = f"""Create slide content for: {main_topic}
+            return f"""Create slide content for: {main_topic}
 
 Slide: {section_title}
 {f"Context: {context}" if context else ""}
@@ -50,125 +233,324 @@ Format:
 - Start each with dash (-)
 - Action-oriented language
 - Include data when relevant"""
+    
+    @staticmethod
+    def _refine_prompt(current_content: str, refinement_prompt: str, section_title: str) -> str:
+        return f"""Refine this content for section "{section_title}":
+
+{current_content}
+
+Request: {refinement_prompt}
+
+Maintain professional tone and key information."""
+    
+    async def _chat_completion_stream(
+        self,
+        model: str,
+        system_message: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+        timeout: Optional[float] = None,
+        use_cache: bool = True,
+        user_id: Optional[int] = None,
+        priority: Priority = Priority.BULK
+    ) -> AsyncIterator[str]:
+        cache_key = response_cache.make_key(model, system_message, prompt, temperature, max_tokens)
+        if use_cache:
+            cached = await response_cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        
+        tokens = model_scheduler.estimate_tokens(system_message, prompt, max_tokens=max_tokens)
+        breaker = self._breaker(model)
+        parts = []
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                # Checked before queueing so an open circuit never holds a slot or tokens
+                breaker.before_call()
+                async with model_scheduler.slot(user_id, priority, tokens) as reservation:
+                    started = time.perf_counter()
+                    try:
+                        stream = await self._get_client().chat.completions.create(
+                            model=model,
+                            messages=[
+                                {"role": "system", "content": system_message},
+                                {"role": "user", "content": prompt}
+                            ],
+                            temperature=temperature,
+                            max_tokens=max_tokens,
+                            timeout=self._timeout(timeout or settings.OPENAI_TIMEOUT),
+                            stream=True
+                        )
+                        async for chunk in stream:
+                            if chunk.choices and chunk.choices[0].delta.content:
+                                parts.append(chunk.choices[0].delta.content)
+                                yield chunk.choices[0].delta.content
+                    except Exception as e:
+                        # Count only what was streamed before the failure
+                        reservation.settle(
+                            model_scheduler.estimate_tokens(system_message, prompt, *parts) if parts else 0
+                        )
+                        MODEL_REQUEST_DURATION.observe(time.perf_counter() - started, model=model, outcome="error")
+                        raise self._record_failure(breaker, e, model) from e
+                    MODEL_REQUEST_DURATION.observe(time.perf_counter() - started, model=model, outcome="success")
+                    breaker.record_success()
+                    # Streamed responses carry no usage block
+                    prompt_tokens = model_scheduler.estimate_tokens(system_message, prompt)
+                    completion_tokens = model_scheduler.estimate_tokens(*parts)
+                    reservation.settle(prompt_tokens + completion_tokens)
+                    MODEL_TOKENS.inc(prompt_tokens, model=model, type="prompt")
+                    MODEL_TOKENS.inc(completion_tokens, model=model, type="completion")
+                break
+            except AIServiceError as error:
+                MODEL_ERRORS.inc(model=model, error=type(error).__name__)
+                # Deltas already sent to the client cannot be taken back
+                delay = None if parts else self._retry_delay(error, attempt)
+                self._log_failure(model, error, attempt, delay)
+                if delay is None:
+                    raise
+            MODEL_RETRIES.inc(model=model)
+            await asyncio.sleep(delay)
         
+        await response_cache.set(cache_key, "".join(parts))
+    
+    async def _stream_with_fallback(
+        self,
+        system_message: str,
+        prompt: str,
+        temperature: float,
+        use_cache: bool = True,
+        user_id: Optional[int] = None,
+        priority: Priority = Priority.BULK
+    ) -> AsyncIterator[str]:
+        # Fall back to GPT-3.5 only if GPT-4 is unavailable and failed before
+        # sending anything; once deltas have reached the client the stream
+        # cannot be restarted
+        started = False
+        try:
+            async for delta in self._chat_completion_stream(
+                model="gpt-4",
+                system_message=system_message,
+                prompt=prompt,
+                temperature=temperature,
+                max_tokens=800,
+                use_cache=use_cache,
+                user_id=user_id,
+                priority=priority
+            ):
+                started = True
+                yield delta
+            return
+        except AIServiceError as error:
+            if started or not error.fallback_allowed:
+                raise
+        MODEL_FALLBACKS.inc(model="gpt-4", fallback="gpt-3.5-turbo")
+        async for delta in self._chat_completion_stream(
+            model="gpt-3.5-turbo",
+            system_message=system_message,
+            prompt=prompt,
+            temperature=temperature,
+            max_tokens=600,
+            use_cache=use_cache,
+            user_id=user_id,
+            priority=priority
+        ):
+            yield delta
+    
+    async def _complete_with_fallback(
+        self,
+        system_message: str,
+        prompt: str,
+        temperature: float,
+        use_cache: bool = True,
+        user_id: Optional[int] = None,
+        priority: Priority = Priority.BULK
+    ) -> str:
         try:
-            response = self.client.chat.completions.create(
+            return await self._chat_completion(
                 model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a professional business writer."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=800
+                system_message=system_message,
+                prompt=prompt,
+                temperature=temperature,
+                max_tokens=800,
+                use_cache=use_cache,
+                user_id=user_id,
+                priority=priority
             )
-            return response.choices[0].message.content
-        except Exception as e:
-            try:
-                response = self.client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are a professional business writer."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.7,
-                    max_tokens=600
-                )
-                return response.choices[0].message.content
-            except Exception:
-                return "Error generating content"
+        except AIServiceError as error:
+            if not error.fallback_allowed:
+                raise
+        # Fallback to GPT-3.5
+        MODEL_FALLBACKS.inc(model="gpt-4", fallback="gpt-3.5-turbo")
+        return await self._chat_completion(
+            model="gpt-3.5-turbo",
+            system_message=system_message,
+            prompt=prompt,
+            temperature=temperature,
+            max_tokens=600,
+            use_cache=use_cache,
+            user_id=user_id,
+            priority=priority
+        )
+    
+    def _ensure_enabled(self):
+        if not self.enabled:
+            raise AIDisabledError(
+                "AI generation is unavailable. Please configure a valid OpenAI API key.",
+                retry_after=settings.AI_HEALTH_CHECK_INTERVAL
+            )
+    
+    async def generate_section_content(
+        self,
+        main_topic: str,
+        section_title: str,
+        document_type: str,
+        context: str = "",
+        use_cache: bool = True,
+        user_id: Optional[int] = None,
+        priority: Priority = Priority.BULK
+    ) -> str:
+        self._ensure_enabled()
+        
+        return await self._complete_with_fallback(
+            system_message="You are a professional business writer.",
+            prompt=self._section_prompt(main_topic, section_title, document_type, context),
+            temperature=0.7,
+            use_cache=use_cache,
+            user_id=user_id,
+            priority=priority
+        )
     
     async def refine_content(
         self,
         current_content: str,
         refinement_prompt: str,
-        section_title: str
+        section_title: str,
+        use_cache: bool = True,
+        user_id: Optional[int] = None,
+        priority: Priority = Priority.INTERACTIVE
     ) -> str:
-        if not self.enabled:
-            return "AI refinement disabled"
+        self._ensure_enabled()
         
-        prompt = f"""Refine this content for section "{section_title}":
-
-{current_content}
-
-Request: {refinement_prompt}
-
-Maintain professional tone and key information."""
+        return await self._complete_with_fallback(
+            system_message="You are a professional editor.",
+            prompt=self._refine_prompt(current_content, refinement_prompt, section_title),
+            temperature=0.7,
+            use_cache=use_cache,
+            user_id=user_id,
+            priority=priority
+        )
+    
+    async def stream_section_content(
+        self,
+        main_topic: str,
+        section_title: str,
+        document_type: str,
+        context: str = "",
+        use_cache: bool = True,
+        user_id: Optional[int] = None,
+        priority: Priority = Priority.BULK
+    ) -> AsyncIterator[str]:
+        """Streaming variant of generate_section_content yielding text deltas"""
+        self._ensure_enabled()
         
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a professional editor."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=800
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            # Fallback to GPT-3.5
-            try:
-                response = self.client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are a professional editor."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.7,
-                    max_tokens=600
-                )
-                return response.choices[0].message.content
-            except Exception:
-                return "Error refining content"
+        prompt = self._section_prompt(main_topic, section_title, document_type, context)
+        async for delta in self._stream_with_fallback(
+            system_message="You are a professional business writer.",
+            prompt=prompt,
+            temperature=0.7,
+            use_cache=use_cache,
+            user_id=user_id,
+            priority=priority
+        ):
+            yield delta
+    
+    async def stream_refined_content(
+        self,
+        current_content: str,
+        refinement_prompt: str,
+        section_title: str,
+        use_cache: bool = True,
+        user_id: Optional[int] = None,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> AsyncIterator[str]:
+        """Streaming variant of refine_content yielding text deltas"""
+        self._ensure_enabled()
+        
+        prompt = self._refine_prompt(current_content, refinement_prompt, section_title)
+        async for delta in self._stream_with_fallback(
+            system_message="You are a professional editor.",
+            prompt=prompt,
+            temperature=0.7,
+            use_cache=use_cache,
+            user_id=user_id,
+            priority=priority
+        ):
+            yield delta
+    
+    @staticmethod
+    def _parse_titles(content: str, num_sections: int) -> List[str]:
+        titles = [line.strip() for line in content.strip().split('\n') if line.strip()]
+        titles = [title.split('. ', 1)[-1] if '. ' in title[:4] else title for title in titles]
+        titles = [title.lstrip('•-* ').strip() for title in titles]
+        return titles[:num_sections]
     
     async def generate_outline(
         self,
         main_topic: str,
         document_type: str,
-        num_sections: int = 5
+        num_sections: int = 5,
+        use_cache: bool = True,
+        placeholder_on_error: bool = True,
+        user_id: Optional[int] = None,
+        priority: Priority = Priority.INTERACTIVE
     ) -> List[str]:
-        if not self.enabled:
-            return [f"Section {i+1}" for i in range(num_sections)]
-        
-        content_type = "document sections" if document_type == "docx" else "presentation slides"
-        prompt = f"""Generate {num_sections} {content_type} titles for: {main_topic}
+        """Section titles for a topic.
 
-Return only titles, one per line, no numbering."""
-        
+        When the models fail, generic "Section N" titles are returned unless
+        ``placeholder_on_error`` is False, in which case the error is raised.
+        """
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a content strategist."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.8,
-                max_tokens=300
-            )
+            self._ensure_enabled()
+            
+            content_type = "document sections" if document_type == "docx" else "presentation slides"
+            prompt = f"""Generate {num_sections} {content_type} titles for: {main_topic}
+
+Return only titles, one per line, no numbering."""
             
-            content = response.choices[0].message.content
-            titles = [line.strip() for line in content.strip().split('\n') if line.strip()]
-            titles = [title.split('. ', 1)[-1] if '. ' in title[:4] else title for title in titles]
-            titles = [title.lstrip('•-* ').strip() for title in titles]
-            return titles[:num_sections]
-        except Exception:
             try:
-                response = self.client.chat.completions.create(
+                content = await self._chat_completion(
+                    model="gpt-4",
+                    system_message="You are a content strategist.",
+                    prompt=prompt,
+                    temperature=0.8,
+                    max_tokens=300,
+                    use_cache=use_cache,
+                    user_id=user_id,
+                    priority=priority
+                )
+            except AIServiceError as error:
+                if not error.fallback_allowed:
+                    raise
+                MODEL_FALLBACKS.inc(model="gpt-4", fallback="gpt-3.5-turbo")
+                content = await self._chat_completion(
                     model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are a professional business consultant."},
-                        {"role": "user", "content": prompt}
-                    ],
+                    system_message="You are a professional business consultant.",
+                    prompt=prompt,
                     temperature=0.7,
-                    max_tokens=200
+                    max_tokens=200,
+                    use_cache=use_cache,
+                    user_id=user_id,
+                    priority=priority
                 )
-                
-                content = response.choices[0].message.content
-                titles = [line.strip() for line in content.strip().split('\n') if line.strip()]
-                titles = [title.split('. ', 1)[-1] if '. ' in title[:4] else title for title in titles]
-                titles = [title.lstrip('•-* ').strip() for title in titles]
-                return titles[:num_sections]
-            except Exception:
-                return [f"Section {i+1}" for i in range(num_sections)]
+            return self._parse_titles(content, num_sections)
+        except AIServiceError:
+            if not placeholder_on_error:
+                raise
+            return [f"Section {i+1}" for i in range(num_sections)]
 
 ai_service = AIService()
@@ -0,0 +1,46 @@
+import time
+from typing import Optional
+from app.services.ai_errors import CircuitOpenError
+
+class CircuitBreaker:
+    """Stops calling a model after repeated failures.
+
+    The circuit opens after ``failure_threshold`` consecutive failed calls
+    and rejects calls for ``reset_seconds``. After that calls go through
+    again (half-open): the first success closes the circuit, the first
+    failure opens it for another cooldown.
+    """
+    
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+    
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_seconds:
+            return "open"
+        return "half_open"
+    
+    def before_call(self):
+        if self.opened_at is None:
+            return
+        remaining = self.opened_at + self.reset_seconds - time.monotonic()
+        if remaining > 0:
+            raise CircuitOpenError(
+                f"{self.name} is temporarily unavailable",
+                retry_after=remaining
+            )
+    
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+    
+    def record_failure(self):
+        self.failures += 1
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
@@ -3,20 +3,74 @@ from docx.shared import Pt, Inches, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from pptx import Presentation
 from pptx.util import Inches as PptxInches, Pt as PptxPt
-from pptx.enum.text import PP_ALIGN, PP_PARAGRAPH_ALIGNMENT
+from pptx.enum.text import PP_ALIGN, PP_PARAGRAPH_ALIGNMENT, MSO_ANCHOR
 from pptx.dml.color import RGBColor as PptxRGBColor
 from pptx.enum.shapes import MSO_SHAPE
+from pptx.oxml.ns import qn
 from io import BytesIO
-from typing import List
+from copy import deepcopy
+from typing import BinaryIO, List, Optional
 from app.models import Project, Section
 from datetime import datetime
 import re
+import threading
+
+# RGB palettes for PPTX exports; "blue" is the original DocuGen look
+PPTX_THEMES = {
+    'blue': {
+        'primary': (31, 78, 121),
+        'primary_light': (41, 98, 151),
+        'accent': (59, 130, 246),
+        'accent_end': (147, 51, 234),
+        'body_text': (64, 64, 64),
+        'placeholder_fill': (240, 245, 250),
+        'placeholder_line': (200, 210, 220),
+        'placeholder_text': (150, 160, 170),
+        'muted_line': (220, 220, 220),
+        'muted_text': (150, 150, 150)
+    },
+    'emerald': {
+        'primary': (6, 78, 59),
+        'primary_light': (4, 120, 87),
+        'accent': (16, 185, 129),
+        'accent_end': (13, 148, 136),
+        'body_text': (55, 65, 81),
+        'placeholder_fill': (236, 253, 245),
+        'placeholder_line': (167, 243, 208),
+        'placeholder_text': (110, 150, 130),
+        'muted_line': (220, 220, 220),
+        'muted_text': (150, 150, 150)
+    },
+    'slate': {
+        'primary': (30, 41, 59),
+        'primary_light': (51, 65, 85),
+        'accent': (249, 115, 22),
+        'accent_end': (225, 29, 72),
+        'body_text': (51, 65, 85),
+        'placeholder_fill': (241, 245, 249),
+        'placeholder_line': (203, 213, 225),
+        'placeholder_text': (148, 163, 184),
+        'muted_line': (226, 232, 240),
+        'muted_text': (148, 163, 184)
+    }
+}
+DEFAULT_PPTX_THEME = 'blue'
+
+# Per-process cache of prebuilt slide fragments, keyed by theme name
+_pptx_templates = {}
+_pptx_template_lock = threading.Lock()
 
 class DocumentService:
     @staticmethod
-    def create_docx(project: Project, sections: List[Section]) -> BytesIO:
-        doc = Document()
-        
+    def _save(document, output: Optional[BinaryIO] = None) -> BinaryIO:
+        """Write the package to ``output`` (a new BytesIO if not given), rewound"""
+        buffer = output if output is not None else BytesIO()
+        document.save(buffer)
+        buffer.seek(0)
+        return buffer
+    
+    @staticmethod
+    def _add_docx_title(doc, project: Project):
         # Set document margins
         section = doc.sections[0]
         section.top_margin = Inches(1)
@@ -49,37 +103,38 @@ class DocumentService:
         
         doc.add_paragraph('_' * 80)
         doc.add_paragraph()
+    
+    @staticmethod
+    def _add_docx_section(doc, idx: int, section: Section):
+        heading = doc.add_heading(f"{idx}. {section.title}", level=1)
+        heading_run = heading.runs[0]
+        heading_run.font.color.rgb = RGBColor(31, 78, 121)
+        heading_run.font.size = Pt(18)
         
-        # Add sections with professional formatting
-        for idx, section in enumerate(sorted(sections, key=lambda x: x.order), 1):
-            heading = doc.add_heading(f"{idx}. {section.title}", level=1)
-            heading_run = heading.runs[0]
-            heading_run.font.color.rgb = RGBColor(31, 78, 121)
-            heading_run.font.size = Pt(18)
-            
-            if section.content:
-                paragraphs = section.content.split('\n\n')
-                for para_text in paragraphs:
-                    if para_text.strip():
-                        if para_text.strip().startswith(('•', '-', '*')):
-                            lines = para_text.split('\n')
-                            for line in lines:
-                                if line.strip():
-                                    clean_line = line.strip().lstrip('•-* ').strip()
-                                    p = doc.add_paragraph(clean_line, style='List Bullet')
-                                    p.paragraph_format.left_indent = Inches(0.5)
-                                    p.paragraph_format.space_after = Pt(6)
-                        else:
-                            p = doc.add_paragraph(para_text.strip())
-                            p.paragraph_format.space_after = Pt(12)
-                            p.paragraph_format.line_spacing = 1.15
-                            for run in p.runs:
-                                run.font.size = Pt(11)
-                                run.font.name = 'Calibri'
-            
-            doc.add_paragraph()
+        if section.content:
+            paragraphs = section.content.split('\n\n')
+            for para_text in paragraphs:
+                if para_text.strip():
+                    if para_text.strip().startswith(('•', '-', '*')):
+                        lines = para_text.split('\n')
+                        for line in lines:
+                            if line.strip():
+                                clean_line = line.strip().lstrip('•-* ').strip()
+                                p = doc.add_paragraph(clean_line, style='List Bullet')
+                                p.paragraph_format.left_indent = Inches(0.5)
+                                p.paragraph_format.space_after = Pt(6)
+                    else:
+                        p = doc.add_paragraph(para_text.strip())
+                        p.paragraph_format.space_after = Pt(12)
+                        p.paragraph_format.line_spacing = 1.15
+                        for run in p.runs:
+                            run.font.size = Pt(11)
+                            run.font.name = 'Calibri'
         
-        # Add footer
+        doc.add_paragraph()
+    
+    @staticmethod
+    def _add_docx_footer(doc, project: Project):
         footer_section = doc.sections[0]
         footer = footer_section.footer
         footer_para = footer.paragraphs[0]
@@ -88,12 +143,19 @@ class DocumentService:
         footer_run = footer_para.runs[0]
         footer_run.font.size = Pt(9)
         footer_run.font.color.rgb = RGBColor(128, 128, 128)
+    
+    @staticmethod
+    def create_docx(project: Project, sections: List[Section], output: Optional[BinaryIO] = None) -> BinaryIO:
+        doc = Document()
+        DocumentService._add_docx_title(doc, project)
         
-        buffer = BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
-        return buffer
-
+        # Add sections with professional formatting
+        for idx, section in enumerate(sorted(sections, key=lambda x: x.order), 1):
+            DocumentService._add_docx_section(doc, idx, section)
+        
+        DocumentService._add_docx_footer(doc, project)
+        return DocumentService._save(doc, output)
+    
     
     @staticmethod
     def _parse_content_structure(content: str) -> dict:
@@ -112,19 +174,20 @@ class DocumentService:
         }
     
     @staticmethod
-    def _add_slide_background(slide, color_scheme='blue'):
+    def _add_slide_background(slide, color_scheme='blue', theme=None):
         """Add professional gradient background"""
+        theme = theme or PPTX_THEMES[DEFAULT_PPTX_THEME]
         background = slide.background
         fill = background.fill
         fill.gradient()
         fill.gradient_angle = 90.0
         
         if color_scheme == 'blue':
-            fill.gradient_stops[0].color.rgb = PptxRGBColor(31, 78, 121)
-            fill.gradient_stops[1].color.rgb = PptxRGBColor(41, 98, 151)
+            fill.gradient_stops[0].color.rgb = PptxRGBColor(*theme['primary'])
+            fill.gradient_stops[1].color.rgb = PptxRGBColor(*theme['primary_light'])
         elif color_scheme == 'accent':
-            fill.gradient_stops[0].color.rgb = PptxRGBColor(59, 130, 246)
-            fill.gradient_stops[1].color.rgb = PptxRGBColor(147, 51, 234)
+            fill.gradient_stops[0].color.rgb = PptxRGBColor(*theme['accent'])
+            fill.gradient_stops[1].color.rgb = PptxRGBColor(*theme['accent_end'])
     
     @staticmethod
     def _add_decorative_shape(slide, position='top-right'):
@@ -146,20 +209,11 @@ class DocumentService:
         shape.fill.fore_color.rgb = PptxRGBColor(59, 130, 246)
         shape.fill.transparency = 0.7
         shape.line.fill.background()
-
     
     @staticmethod
-    def create_pptx(project: Project, sections: List[Section]) -> BytesIO:
-        prs = Presentation()
-        prs.slide_width = PptxInches(10)
-        prs.slide_height = PptxInches(7.5)
-        
-        # ===== TITLE SLIDE =====
-        title_slide_layout = prs.slide_layouts[6]  # Blank layout for custom design
-        slide = prs.slides.add_slide(title_slide_layout)
-        
+    def _build_title_slide(slide, theme: dict):
         # Gradient background
-        DocumentService._add_slide_background(slide, 'blue')
+        DocumentService._add_slide_background(slide, 'blue', theme)
         
         # Decorative shapes
         shape1 = slide.shapes.add_shape(
@@ -168,7 +222,7 @@ class DocumentService:
             PptxInches(2), PptxInches(2)
         )
         shape1.fill.solid()
-        shape1.fill.fore_color.rgb = PptxRGBColor(59, 130, 246)
+        shape1.fill.fore_color.rgb = PptxRGBColor(*theme['accent'])
         shape1.fill.transparency = 0.3
         shape1.line.fill.background()
         shape1.rotation = 45
@@ -178,10 +232,10 @@ class DocumentService:
             PptxInches(1), PptxInches(2.5),
             PptxInches(8), PptxInches(1.5)
         )
+        title_box.name = 'Title'
         title_frame = title_box.text_frame
         title_frame.word_wrap = True
         title_para = title_frame.paragraphs[0]
-        title_para.text = project.title
         title_para.font.size = PptxPt(54)
         title_para.font.bold = True
         title_para.font.color.rgb = PptxRGBColor(255, 255, 255)
@@ -192,9 +246,9 @@ class DocumentService:
             PptxInches(1), PptxInches(4.2),
             PptxInches(8), PptxInches(1)
         )
+        subtitle_box.name = 'Subtitle'
         subtitle_frame = subtitle_box.text_frame
         subtitle_para = subtitle_frame.paragraphs[0]
-        subtitle_para.text = project.main_topic
         subtitle_para.font.size = PptxPt(28)
         subtitle_para.font.color.rgb = PptxRGBColor(220, 220, 220)
         subtitle_para.alignment = PP_ALIGN.CENTER
@@ -204,185 +258,152 @@ class DocumentService:
             PptxInches(1), PptxInches(6.5),
             PptxInches(8), PptxInches(0.5)
         )
+        date_box.name = 'Date'
         date_frame = date_box.text_frame
         date_para = date_frame.paragraphs[0]
-        date_para.text = datetime.now().strftime('%B %d, %Y')
         date_para.font.size = PptxPt(18)
         date_para.font.color.rgb = PptxRGBColor(200, 200, 200)
         date_para.alignment = PP_ALIGN.CENTER
-
+    
+    @staticmethod
+    def _build_content_slide(slide, theme: dict):
+        # White background with subtle gradient
+        background = slide.background
+        fill = background.fill
+        fill.solid()
+        fill.fore_color.rgb = PptxRGBColor(255, 255, 255)
         
-        # ===== CONTENT SLIDES =====
-        for idx, section in enumerate(sorted(sections, key=lambda x: x.order), 1):
-            # Use blank layout for full customization
-            slide = prs.slides.add_slide(prs.slide_layouts[6])
-            
-            # White background with subtle gradient
-            background = slide.background
-            fill = background.fill
-            fill.solid()
-            fill.fore_color.rgb = PptxRGBColor(255, 255, 255)
-            
-            # Top accent bar
-            accent_bar = slide.shapes.add_shape(
-                MSO_SHAPE.RECTANGLE,
-                PptxInches(0), PptxInches(0),
-                PptxInches(10), PptxInches(0.15)
-            )
-            accent_bar.fill.solid()
-            accent_bar.fill.fore_color.rgb = PptxRGBColor(59, 130, 246)
-            accent_bar.line.fill.background()
-            
-            # Slide number badge
-            num_circle = slide.shapes.add_shape(
-                MSO_SHAPE.OVAL,
-                PptxInches(9.2), PptxInches(0.3),
-                PptxInches(0.6), PptxInches(0.6)
-            )
-            num_circle.fill.solid()
-            num_circle.fill.fore_color.rgb = PptxRGBColor(59, 130, 246)
-            num_circle.line.fill.background()
-            
-            num_text = num_circle.text_frame
-            num_para = num_text.paragraphs[0]
-            num_para.text = str(idx)
-            num_para.font.size = PptxPt(16)
-            num_para.font.bold = True
-            num_para.font.color.rgb = PptxRGBColor(255, 255, 255)
-            num_para.alignment = PP_ALIGN.CENTER
-            
-            # Title with underline accent
-            title_box = slide.shapes.add_textbox(
-                PptxInches(0.8), PptxInches(0.8),
-                PptxInches(8), PptxInches(0.8)
-            )
-            title_frame = title_box.text_frame
-            title_para = title_frame.paragraphs[0]
-            title_para.text = section.title
-            title_para.font.size = PptxPt(36)
-            title_para.font.bold = True
-            title_para.font.color.rgb = PptxRGBColor(31, 78, 121)
-            
-            # Title underline
-            underline = slide.shapes.add_shape(
-                MSO_SHAPE.RECTANGLE,
-                PptxInches(0.8), PptxInches(1.65),
-                PptxInches(2), PptxInches(0.08)
-            )
-            underline.fill.solid()
-            underline.fill.fore_color.rgb = PptxRGBColor(59, 130, 246)
-            underline.line.fill.background()
-            
-            # Parse content structure
-            content_info = DocumentService._parse_content_structure(section.content)
-
-            
-            # Determine layout based on content
-            if content_info['needs_image'] and len(content_info['bullet_points']) <= 3:
-                # TWO-COLUMN LAYOUT: Content + Image Placeholder
-                
-                # Left column - Content
-                content_box = slide.shapes.add_textbox(
-                    PptxInches(0.8), PptxInches(2.2),
-                    PptxInches(4.5), PptxInches(4.5)
-                )
-                text_frame = content_box.text_frame
-                text_frame.word_wrap = True
-                
-                for i, bullet in enumerate(content_info['bullet_points']):
-                    clean_bullet = bullet.lstrip('•-*123456789. ').strip()
-                    
-                    if i == 0:
-                        p = text_frame.paragraphs[0]
-                    else:
-                        p = text_frame.add_paragraph()
-                    
-                    p.text = clean_bullet
-                    p.level = 0
-                    p.font.size = PptxPt(20)
-                    p.font.color.rgb = PptxRGBColor(64, 64, 64)
-                    p.space_before = PptxPt(16)
-                    p.space_after = PptxPt(16)
-                    p.line_spacing = 1.3
-                
-                # Right column - Image Placeholder
-                img_placeholder = slide.shapes.add_shape(
-                    MSO_SHAPE.ROUNDED_RECTANGLE,
-                    PptxInches(5.5), PptxInches(2.2),
-                    PptxInches(3.8), PptxInches(4.5)
-                )
-                img_placeholder.fill.solid()
-                img_placeholder.fill.fore_color.rgb = PptxRGBColor(240, 245, 250)
-                img_placeholder.line.color.rgb = PptxRGBColor(200, 210, 220)
-                img_placeholder.line.width = PptxPt(2)
-                
-                # Icon in placeholder
-                icon_text = img_placeholder.text_frame
-                icon_para = icon_text.paragraphs[0]
-                icon_para.text = "📊\n\nImage\nPlaceholder"
-                icon_para.font.size = PptxPt(24)
-                icon_para.font.color.rgb = PptxRGBColor(150, 160, 170)
-                icon_para.alignment = PP_ALIGN.CENTER
-                icon_text.vertical_anchor = 2  # Middle
-            
-            else:
-                # SINGLE COLUMN LAYOUT: Full-width content
-                content_box = slide.shapes.add_textbox(
-                    PptxInches(0.8), PptxInches(2.2),
-                    PptxInches(8.4), PptxInches(4.5)
-                )
-                text_frame = content_box.text_frame
-                text_frame.word_wrap = True
-                
-                for i, bullet in enumerate(content_info['bullet_points']):
-                    clean_bullet = bullet.lstrip('•-*123456789. ').strip()
-                    
-                    if i == 0:
-                        p = text_frame.paragraphs[0]
-                    else:
-                        p = text_frame.add_paragraph()
-                    
-                    p.text = clean_bullet
-                    p.level = 0
-                    p.font.size = PptxPt(22)
-                    p.font.color.rgb = PptxRGBColor(64, 64, 64)
-                    p.space_before = PptxPt(18)
-                    p.space_after = PptxPt(18)
-                    p.line_spacing = 1.3
-                    
-                    # Add bullet styling
-                    p.font.bold = False
-            
-            # Footer line
-            footer_line = slide.shapes.add_shape(
-                MSO_SHAPE.RECTANGLE,
-                PptxInches(0.8), PptxInches(7),
-                PptxInches(8.4), PptxInches(0.02)
+        # Top accent bar
+        accent_bar = slide.shapes.add_shape(
+            MSO_SHAPE.RECTANGLE,
+            PptxInches(0), PptxInches(0),
+            PptxInches(10), PptxInches(0.15)
+        )
+        accent_bar.fill.solid()
+        accent_bar.fill.fore_color.rgb = PptxRGBColor(*theme['accent'])
+        accent_bar.line.fill.background()
+        
+        # Slide number badge
+        num_circle = slide.shapes.add_shape(
+            MSO_SHAPE.OVAL,
+            PptxInches(9.2), PptxInches(0.3),
+            PptxInches(0.6), PptxInches(0.6)
+        )
+        num_circle.name = 'Number'
+        num_circle.fill.solid()
+        num_circle.fill.fore_color.rgb = PptxRGBColor(*theme['accent'])
+        num_circle.line.fill.background()
+        
+        num_text = num_circle.text_frame
+        num_para = num_text.paragraphs[0]
+        num_para.font.size = PptxPt(16)
+        num_para.font.bold = True
+        num_para.font.color.rgb = PptxRGBColor(255, 255, 255)
+        num_para.alignment = PP_ALIGN.CENTER
+        
+        # Title with underline accent
+        title_box = slide.shapes.add_textbox(
+            PptxInches(0.8), PptxInches(0.8),
+            PptxInches(8), PptxInches(0.8)
+        )
+        title_box.name = 'Title'
+        title_frame = title_box.text_frame
+        title_para = title_frame.paragraphs[0]
+        title_para.font.size = PptxPt(36)
+        title_para.font.bold = True
+        title_para.font.color.rgb = PptxRGBColor(*theme['primary'])
+        
+        # Title underline
+        underline = slide.shapes.add_shape(
+            MSO_SHAPE.RECTANGLE,
+            PptxInches(0.8), PptxInches(1.65),
+            PptxInches(2), PptxInches(0.08)
+        )
+        underline.fill.solid()
+        underline.fill.fore_color.rgb = PptxRGBColor(*theme['accent'])
+        underline.line.fill.background()
+        
+        # Footer line
+        footer_line = slide.shapes.add_shape(
+            MSO_SHAPE.RECTANGLE,
+            PptxInches(0.8), PptxInches(7),
+            PptxInches(8.4), PptxInches(0.02)
+        )
+        footer_line.fill.solid()
+        footer_line.fill.fore_color.rgb = PptxRGBColor(*theme['muted_line'])
+        footer_line.line.fill.background()
+        
+        # Footer text
+        footer_box = slide.shapes.add_textbox(
+            PptxInches(0.8), PptxInches(7.1),
+            PptxInches(7), PptxInches(0.3)
+        )
+        footer_box.name = 'Footer'
+        footer_frame = footer_box.text_frame
+        footer_para = footer_frame.paragraphs[0]
+        footer_para.font.size = PptxPt(11)
+        footer_para.font.color.rgb = PptxRGBColor(*theme['muted_text'])
+    
+    @staticmethod
+    def _build_body(slide, theme: dict, single_column: bool):
+        if single_column:
+            # SINGLE COLUMN LAYOUT: Full-width content
+            content_box = slide.shapes.add_textbox(
+                PptxInches(0.8), PptxInches(2.2),
+                PptxInches(8.4), PptxInches(4.5)
             )
-            footer_line.fill.solid()
-            footer_line.fill.fore_color.rgb = PptxRGBColor(220, 220, 220)
-            footer_line.line.fill.background()
-            
-            # Footer text
-            footer_box = slide.shapes.add_textbox(
-                PptxInches(0.8), PptxInches(7.1),
-                PptxInches(7), PptxInches(0.3)
+            font_size, spacing = 22, 18
+        else:
+            # TWO-COLUMN LAYOUT: Left column content next to the image placeholder
+            content_box = slide.shapes.add_textbox(
+                PptxInches(0.8), PptxInches(2.2),
+                PptxInches(4.5), PptxInches(4.5)
             )
-            footer_frame = footer_box.text_frame
-            footer_para = footer_frame.paragraphs[0]
-            footer_para.text = project.title
-            footer_para.font.size = PptxPt(11)
-            footer_para.font.color.rgb = PptxRGBColor(150, 150, 150)
-
+            font_size, spacing = 20, 16
+        content_box.name = 'Body'
+        text_frame = content_box.text_frame
+        text_frame.word_wrap = True
         
-        # ===== THANK YOU SLIDE =====
-        end_slide = prs.slides.add_slide(prs.slide_layouts[6])
+        # Formatted prototype paragraph, copied once per bullet
+        p = text_frame.paragraphs[0]
+        p.level = 0
+        p.font.size = PptxPt(font_size)
+        p.font.color.rgb = PptxRGBColor(*theme['body_text'])
+        p.space_before = PptxPt(spacing)
+        p.space_after = PptxPt(spacing)
+        p.line_spacing = 1.3
+        if single_column:
+            p.font.bold = False
+    
+    @staticmethod
+    def _build_image_placeholder(slide, theme: dict):
+        # Right column - Image Placeholder
+        img_placeholder = slide.shapes.add_shape(
+            MSO_SHAPE.ROUNDED_RECTANGLE,
+            PptxInches(5.5), PptxInches(2.2),
+            PptxInches(3.8), PptxInches(4.5)
+        )
+        img_placeholder.fill.solid()
+        img_placeholder.fill.fore_color.rgb = PptxRGBColor(*theme['placeholder_fill'])
+        img_placeholder.line.color.rgb = PptxRGBColor(*theme['placeholder_line'])
+        img_placeholder.line.width = PptxPt(2)
         
+        # Icon in placeholder
+        icon_text = img_placeholder.text_frame
+        icon_para = icon_text.paragraphs[0]
+        icon_para.text = "📊\n\nImage\nPlaceholder"
+        icon_para.font.size = PptxPt(24)
+        icon_para.font.color.rgb = PptxRGBColor(*theme['placeholder_text'])
+        icon_para.alignment = PP_ALIGN.CENTER
+        icon_text.vertical_anchor = MSO_ANCHOR.MIDDLE
+    
+    @staticmethod
+    def _build_end_slide(slide, theme: dict):
         # Gradient background
-        DocumentService._add_slide_background(end_slide, 'accent')
+        DocumentService._add_slide_background(slide, 'accent', theme)
         
         # Decorative circle
-        circle = end_slide.shapes.add_shape(
+        circle = slide.shapes.add_shape(
             MSO_SHAPE.OVAL,
             PptxInches(3.5), PptxInches(2),
             PptxInches(3), PptxInches(3)
@@ -393,7 +414,7 @@ class DocumentService:
         circle.line.fill.background()
         
         # Thank you text
-        thank_you_box = end_slide.shapes.add_textbox(
+        thank_you_box = slide.shapes.add_textbox(
             PptxInches(1), PptxInches(3),
             PptxInches(8), PptxInches(1.5)
         )
@@ -406,7 +427,7 @@ class DocumentService:
         thank_you_para.alignment = PP_ALIGN.CENTER
         
         # Subtitle
-        subtitle_box = end_slide.shapes.add_textbox(
+        subtitle_box = slide.shapes.add_textbox(
             PptxInches(1), PptxInches(4.8),
             PptxInches(8), PptxInches(0.8)
         )
@@ -418,7 +439,7 @@ class DocumentService:
         subtitle_para.alignment = PP_ALIGN.CENTER
         
         # Footer
-        footer_box = end_slide.shapes.add_textbox(
+        footer_box = slide.shapes.add_textbox(
             PptxInches(1), PptxInches(6.8),
             PptxInches(8), PptxInches(0.5)
         )
@@ -428,10 +449,130 @@ class DocumentService:
         footer_para.font.size = PptxPt(16)
         footer_para.font.color.rgb = PptxRGBColor(200, 200, 200)
         footer_para.alignment = PP_ALIGN.CENTER
+    
+    @staticmethod
+    def _slide_fragment(slide) -> dict:
+        """Detach a built slide's background and shapes as reusable XML"""
+        c_sld = slide._element.cSld
+        return {
+            'background': c_sld.bg,
+            'shapes': list(slide.shapes._spTree.iter_shape_elms())
+        }
+    
+    @staticmethod
+    def _get_pptx_template(theme_name: str) -> dict:
+        """Build every slide's static decoration once per theme and process"""
+        with _pptx_template_lock:
+            template = _pptx_templates.get(theme_name)
+            if template is not None:
+                return template
+            
+            theme = PPTX_THEMES[theme_name]
+            prs = Presentation()
+            prs.slide_width = PptxInches(10)
+            prs.slide_height = PptxInches(7.5)
+            blank = prs.slide_layouts[6]  # Blank layout for custom design
+            
+            builders = {
+                'title': DocumentService._build_title_slide,
+                'content': DocumentService._build_content_slide,
+                'body_single': lambda slide, theme: DocumentService._build_body(slide, theme, True),
+                'body_two_column': lambda slide, theme: DocumentService._build_body(slide, theme, False),
+                'image': DocumentService._build_image_placeholder,
+                'end': DocumentService._build_end_slide
+            }
+            template = {}
+            for name, build in builders.items():
+                slide = prs.slides.add_slide(blank)
+                build(slide, theme)
+                template[name] = DocumentService._slide_fragment(slide)
+            
+            _pptx_templates[theme_name] = template
+            return template
+    
+    @staticmethod
+    def _apply_fragment(slide, fragment: dict) -> dict:
+        """Copy a template fragment onto ``slide`` and return its named shapes"""
+        if fragment['background'] is not None:
+            slide._element.cSld.insert(0, deepcopy(fragment['background']))
+        sp_tree = slide.shapes._spTree
+        # Copies keep the ids they had on the template slide; give them fresh
+        # ones so ids stay unique within this slide
+        next_id = sp_tree.max_shape_id + 1
+        for element in fragment['shapes']:
+            shape = deepcopy(element)
+            for c_nv_pr in shape.iter(qn('p:cNvPr')):
+                c_nv_pr.id = next_id
+                next_id += 1
+            sp_tree.insert_element_before(shape, 'p:extLst')
+        return {shape.name: shape for shape in slide.shapes}
+    
+    @staticmethod
+    def _add_title_slide(prs, template: dict, project: Project):
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        shapes = DocumentService._apply_fragment(slide, template['title'])
+        shapes['Title'].text_frame.paragraphs[0].text = project.title
+        shapes['Subtitle'].text_frame.paragraphs[0].text = project.main_topic
+        shapes['Date'].text_frame.paragraphs[0].text = datetime.now().strftime('%B %d, %Y')
+    
+    @staticmethod
+    def _add_content_slide(prs, template: dict, project: Project, idx: int, section: Section):
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        shapes = DocumentService._apply_fragment(slide, template['content'])
+        shapes['Number'].text_frame.paragraphs[0].text = str(idx)
+        shapes['Title'].text_frame.paragraphs[0].text = section.title
+        shapes['Footer'].text_frame.paragraphs[0].text = project.title
         
-        buffer = BytesIO()
-        prs.save(buffer)
-        buffer.seek(0)
-        return buffer
+        # Parse content structure
+        content_info = DocumentService._parse_content_structure(section.content)
+        
+        # Determine layout based on content
+        two_column = content_info['needs_image'] and len(content_info['bullet_points']) <= 3
+        body = DocumentService._apply_fragment(
+            slide, template['body_two_column' if two_column else 'body_single']
+        )['Body']
+        if two_column:
+            DocumentService._apply_fragment(slide, template['image'])
+        
+        bullets = [
+            bullet.lstrip('•-*123456789. ').strip()
+            for bullet in content_info['bullet_points']
+        ]
+        tx_body = body.text_frame._txBody
+        prototype = tx_body.p_lst[0]
+        for _ in bullets[1:]:
+            tx_body.append(deepcopy(prototype))
+        for p, clean_bullet in zip(body.text_frame.paragraphs, bullets):
+            p.text = clean_bullet
+    
+    @staticmethod
+    def _add_end_slide(prs, template: dict):
+        end_slide = prs.slides.add_slide(prs.slide_layouts[6])
+        DocumentService._apply_fragment(end_slide, template['end'])
+    
+    @staticmethod
+    def create_pptx(
+        project: Project,
+        sections: List[Section],
+        theme: str = DEFAULT_PPTX_THEME,
+        output: Optional[BinaryIO] = None
+    ) -> BinaryIO:
+        template = DocumentService._get_pptx_template(theme)
+        
+        prs = Presentation()
+        prs.slide_width = PptxInches(10)
+        prs.slide_height = PptxInches(7.5)
+        
+        # ===== TITLE SLIDE =====
+        DocumentService._add_title_slide(prs, template, project)
+        
+        # ===== CONTENT SLIDES =====
+        for idx, section in enumerate(sorted(sections, key=lambda x: x.order), 1):
+            DocumentService._add_content_slide(prs, template, project, idx, section)
+        
+        # ===== THANK YOU SLIDE =====
+        DocumentService._add_end_slide(prs, template)
+        
+        return DocumentService._save(prs, output)
 
 document_service = DocumentService()
@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime
+from typing import BinaryIO, List, Optional
+from app.config import get_settings
+from app.models import Project, Section
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+class ExportCache:
+    """On-disk cache of rendered DOCX/PPTX files keyed by project content.
+
+    Files are evicted least-recently-used first once the directory grows
+    past ``max_bytes``. Commits keep a running total of the directory size
+    and only scan it, in a thread, when that total goes over.
+    """
+    
+    def __init__(self, directory: str, max_bytes: int, enabled: bool = True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # Estimated directory size; None until the first scan
+        self._size: Optional[int] = None
+        self._evicting: Optional[asyncio.Task] = None
+        if enabled:
+            os.makedirs(directory, exist_ok=True)
+    
+    @staticmethod
+    def digest(
+        project: Project,
+        sections: List[Section],
+        file_format: str,
+        theme: Optional[str] = None
+    ) -> str:
+        payload = json.dumps({
+            "format": file_format,
+            "theme": theme,
+            "title": project.title,
+            "main_topic": project.main_topic,
+            "document_type": project.document_type.value,
+            # Both renderers stamp the current date into the file
+            "date": datetime.now().strftime('%Y-%m-%d'),
+            "sections": [
+                [section.order, section.title, section.content or ""]
+                for section in sorted(sections, key=lambda x: x.order)
+            ]
+        }, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _path(self, key: str, file_format: str) -> str:
+        return os.path.join(self.directory, f"{key}.{file_format}")
+    
+    def _open(self, path: str, touch: bool) -> Optional[BinaryIO]:
+        try:
+            file = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        if touch:
+            # mtime doubles as the last-access time for eviction
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+        return file
+    
+    async def open(self, key: str, file_format: str) -> Optional[BinaryIO]:
+        """The cached file, opened for reading, or None on a miss.
+
+        Callers stream from the open file, so eviction removing the path
+        in the meantime doesn't affect them.
+        """
+        if not self.enabled:
+            return None
+        return await asyncio.to_thread(self._open, self._path(key, file_format), True)
+    
+    def reserve(self, file_format: str) -> str:
+        """Path of a new, empty file for a render to write into.
+
+        It lives in the cache directory so ``commit`` can rename it into
+        place; with the cache disabled it is an ordinary temp file.
+        """
+        directory = self.directory if self.enabled else None
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=f".{file_format}.tmp")
+        os.close(fd)
+        return tmp_path
+    
+    async def commit(self, key: str, file_format: str, tmp_path: str) -> Optional[BinaryIO]:
+        """Move a rendered file from ``reserve`` into the cache and return it
+        opened for reading, or None if caching is disabled (the caller owns
+        ``tmp_path``)"""
+        if not self.enabled:
+            return None
+        path = self._path(key, file_format)
+        
+        def move_and_open():
+            os.replace(tmp_path, path)
+            return self._open(path, False)
+        
+        file = await asyncio.to_thread(move_and_open)
+        size = os.fstat(file.fileno()).st_size
+        if self._size is not None:
+            self._size += size
+        if self._size is None or self._size > self.max_bytes:
+            self._schedule_evict(keep=path)
+        return file
+    
+    @staticmethod
+    def discard(tmp_path: str):
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+    
+    def _schedule_evict(self, keep: str):
+        if self._evicting is None or self._evicting.done():
+            self._evicting = asyncio.get_running_loop().create_task(self._evict_in_background(keep))
+    
+    async def _evict_in_background(self, keep: str):
+        try:
+            await asyncio.to_thread(self._evict, keep)
+        except Exception as e:
+            logger.warning("Export cache eviction failed", exc_info=e)
+    
+    def _evict(self, keep: str):
+        """Scan the directory and remove least recently used files until it
+        fits in ``max_bytes``; runs in a thread.
+
+        The scan also resets the running size estimate, which picks up
+        files written by other workers sharing the directory.
+        """
+        with self._lock:
+            entries = []
+            total = 0
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if not entry.is_file() or entry.name.endswith(".tmp"):
+                        continue
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+            
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                except FileNotFoundError:
+                    total -= size
+                except OSError:
+                    # Windows refuses to delete files that are being served
+                    pass
+            self._size = total
+
+export_cache = ExportCache(
+    directory=settings.EXPORT_CACHE_DIR or os.path.join(tempfile.gettempdir(), "docugen-exports"),
+    max_bytes=settings.EXPORT_CACHE_MAX_BYTES,
+    enabled=settings.EXPORT_CACHE_ENABLED
+)
@@ -0,0 +1,172 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from app.config import get_settings
+from app.schemas.refinement import AIOutlineRequest, AIOutlineResult, GenerationStrategy
+from app.services.ai_service import ai_service
+from app.services.ai_errors import AIServiceError
+from app.services.model_scheduler import Priority, SchedulerQueueFull
+
+settings = get_settings()
+
+SectionCallback = Callable[[int, str], Awaitable[None]]
+
+class GenerationService:
+    """Generates the bodies of a project's sections, optionally in parallel.
+    
+    The per-request limits below only bound one request's fan-out; the
+    worker-wide cap, fairness across users and priorities are left to
+    model_scheduler so waiting calls are ordered by it alone.
+    """
+    
+    @staticmethod
+    def _outline_context(section_titles: List[str]) -> str:
+        outline = "\n".join(f"{idx}. {title}" for idx, title in enumerate(section_titles, 1))
+        return f"Document outline:\n{outline}"
+    
+    async def _generate_one(
+        self,
+        semaphore: asyncio.Semaphore,
+        index: int,
+        main_topic: str,
+        section_title: str,
+        document_type: str,
+        context: str,
+        use_cache: bool,
+        on_complete: Optional[SectionCallback],
+        user_id: Optional[int]
+    ) -> str:
+        async with semaphore:
+            content = await ai_service.generate_section_content(
+                main_topic=main_topic,
+                section_title=section_title,
+                document_type=document_type,
+                context=context,
+                use_cache=use_cache,
+                user_id=user_id
+            )
+        if on_complete is not None:
+            await on_complete(index, content)
+        return content
+    
+    async def generate_sections(
+        self,
+        main_topic: str,
+        document_type: str,
+        section_titles: List[str],
+        strategy: GenerationStrategy = GenerationStrategy.SEQUENTIAL,
+        max_concurrency: Optional[int] = None,
+        use_cache: bool = True,
+        on_complete: Optional[SectionCallback] = None,
+        user_id: Optional[int] = None
+    ) -> List[str]:
+        """Return generated content for each title, in the order given.
+        
+        ``on_complete(index, content)`` is awaited as soon as each section
+        finishes, which lets callers persist partial results.
+        """
+        if strategy == GenerationStrategy.SEQUENTIAL:
+            contents = []
+            context = ""
+            for index, title in enumerate(section_titles):
+                content = await ai_service.generate_section_content(
+                    main_topic=main_topic,
+                    section_title=title,
+                    document_type=document_type,
+                    context=context,
+                    use_cache=use_cache,
+                    user_id=user_id
+                )
+                contents.append(content)
+                if on_complete is not None:
+                    await on_complete(index, content)
+                context += f"\n{title}: {content[:200]}..."
+            return contents
+        
+        limit = min(
+            max_concurrency or settings.GENERATION_MAX_CONCURRENCY,
+            settings.GENERATION_MAX_CONCURRENCY
+        )
+        semaphore = asyncio.Semaphore(limit)
+        
+        if strategy == GenerationStrategy.OUTLINE:
+            context = self._outline_context(section_titles)
+        else:
+            context = ""
+        
+        tasks = [
+            asyncio.create_task(self._generate_one(
+                semaphore, index, main_topic, title, document_type, context, use_cache,
+                on_complete, user_id
+            ))
+            for index, title in enumerate(section_titles)
+        ]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            # One failed section fails the request; stop spending tokens on the rest
+            for task in tasks:
+                task.cancel()
+            raise
+    
+    @staticmethod
+    def _outline_key(request: AIOutlineRequest) -> Tuple:
+        return (
+            request.main_topic.strip(),
+            request.document_type,
+            request.num_sections or 5,
+            request.bypass_cache
+        )
+    
+    async def generate_outlines(
+        self,
+        requests: List[AIOutlineRequest],
+        max_concurrency: Optional[int] = None,
+        user_id: Optional[int] = None
+    ) -> List[AIOutlineResult]:
+        """Outline every request, one result per request in the order given.
+        
+        Identical requests are generated once, and a failed topic is reported
+        in its own result instead of failing the batch.
+        """
+        limit = min(
+            max_concurrency or settings.GENERATION_MAX_CONCURRENCY,
+            settings.GENERATION_MAX_CONCURRENCY
+        )
+        semaphore = asyncio.Semaphore(limit)
+        
+        async def outline(request: AIOutlineRequest) -> AIOutlineResult:
+            async with semaphore:
+                try:
+                    titles = await ai_service.generate_outline(
+                        main_topic=request.main_topic,
+                        document_type=request.document_type,
+                        num_sections=request.num_sections or 5,
+                        use_cache=not request.bypass_cache,
+                        placeholder_on_error=False,
+                        user_id=user_id,
+                        priority=Priority.BULK
+                    )
+                except SchedulerQueueFull:
+                    raise
+                except AIServiceError as e:
+                    return AIOutlineResult(error=str(e))
+            return AIOutlineResult(titles=titles)
+        
+        unique: Dict[Tuple, AIOutlineRequest] = {}
+        for request in requests:
+            unique.setdefault(self._outline_key(request), request)
+        
+        keys = list(unique)
+        tasks = [asyncio.create_task(outline(unique[key])) for key in keys]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            # A full scheduler queue fails the whole batch with 429; don't
+            # keep spending model slots and tokens on the other topics
+            for task in tasks:
+                task.cancel()
+            raise
+        by_key = dict(zip(keys, results))
+        return [by_key[self._outline_key(request)] for request in requests]
+
+generation_service = GenerationService()
@@ -0,0 +1,437 @@
+import asyncio
+import copy
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional
+from app.config import get_settings
+from sqlalchemy import or_, select, update
+from app.db.database import AsyncSessionLocal
+from app.models import Project, Section, GenerationJob, JobStatus
+from app.schemas.refinement import GenerationStrategy
+from app.services.generation_service import generation_service
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED)
+UNFINISHED_STATUSES = (JobStatus.QUEUED, JobStatus.RUNNING)
+
+class JobBackend(ABC):
+    """Storage for generation job state.
+
+    Jobs are plain dicts with the same keys as ``GenerationJob`` so any
+    store that can hold a JSON document per id can serve as a backend.
+    Methods are called from the event loop, so they are coroutines.
+    
+    Every app worker runs its own JobService against the backend, so an
+    unfinished job is leased to the worker running it (``owner``). Shared
+    backends must only hand a job to another owner once its lease expired.
+    """
+    
+    @abstractmethod
+    async def create(self, job: dict, owner: str, lease_seconds: float) -> None:
+        ...
+    
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[dict]:
+        ...
+    
+    @abstractmethod
+    async def update(self, job_id: str, **fields) -> None:
+        ...
+    
+    @abstractmethod
+    async def mark_section(self, job_id: str, section_id: int, status: str) -> None:
+        ...
+    
+    @abstractmethod
+    async def claim(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """Lease an unfinished job to ``owner`` unless another owner holds a live lease"""
+    
+    @abstractmethod
+    async def claim_expired(self, owner: str, lease_seconds: float) -> List[str]:
+        """Lease every unfinished job whose owner stopped renewing it; oldest first"""
+    
+    @abstractmethod
+    async def renew(self, owner: str, lease_seconds: float) -> None:
+        ...
+    
+    @abstractmethod
+    async def release(self, owner: str) -> None:
+        """Give up ``owner``'s unfinished jobs so any worker can resume them"""
+
+class MemoryJobBackend(JobBackend):
+    """Process-local store; job state is lost when the worker restarts.
+
+    Finished jobs are kept for ``ttl_seconds`` so clients can read the
+    result, and at most ``max_finished`` of them are kept at all.
+    """
+    
+    def __init__(self, ttl_seconds: float, max_finished: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_finished = max_finished
+        self._jobs: Dict[str, dict] = {}
+        # Finished job ids in the order they finished, with the monotonic time
+        self._finished: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _evict(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._finished:
+            job_id, finished_at = next(iter(self._finished.items()))
+            if finished_at >= cutoff and len(self._finished) <= self.max_finished:
+                break
+            del self._finished[job_id]
+            del self._jobs[job_id]
+    
+    async def create(self, job: dict, owner: str, lease_seconds: float) -> None:
+        with self._lock:
+            self._evict()
+            self._jobs[job["id"]] = copy.deepcopy(job)
+    
+    async def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            self._evict()
+            job = self._jobs.get(job_id)
+            return copy.deepcopy(job) if job else None
+    
+    async def update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            self._jobs[job_id].update(fields, updated_at=datetime.utcnow())
+            if fields.get("status") in TERMINAL_STATUSES:
+                self._finished[job_id] = time.monotonic()
+                self._evict()
+    
+    async def mark_section(self, job_id: str, section_id: int, status: str) -> None:
+        with self._lock:
+            job = self._jobs[job_id]
+            job["section_status"][str(section_id)] = status
+            job["completed_sections"] = sum(
+                1 for value in job["section_status"].values() if value == "completed"
+            )
+            job["updated_at"] = datetime.utcnow()
+    
+    # Jobs never outlive the process that owns them, so leases are moot
+    async def claim(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job is not None and job["status"] not in TERMINAL_STATUSES
+    
+    async def claim_expired(self, owner: str, lease_seconds: float) -> List[str]:
+        return []
+    
+    async def renew(self, owner: str, lease_seconds: float) -> None:
+        pass
+    
+    async def release(self, owner: str) -> None:
+        pass
+
+class DatabaseJobBackend(JobBackend):
+    """Stores jobs in the application database (SQLite locally, Postgres in production)"""
+    
+    @staticmethod
+    def _to_dict(job: GenerationJob) -> dict:
+        return {
+            "id": job.id,
+            "status": job.status,
+            "strategy": job.strategy,
+            "max_concurrency": job.max_concurrency,
+            "use_cache": job.use_cache,
+            "total_sections": job.total_sections,
+            "completed_sections": job.completed_sections,
+            "section_status": dict(job.section_status or {}),
+            "error": job.error,
+            "created_at": job.created_at,
+            "updated_at": job.updated_at,
+            "project_id": job.project_id,
+            "user_id": job.user_id
+        }
+    
+    @staticmethod
+    def _lease(owner: str, lease_seconds: float) -> dict:
+        return {
+            "owner": owner,
+            "lease_expires_at": datetime.utcnow() + timedelta(seconds=lease_seconds),
+            # Lease bookkeeping is not progress; keep watch() from reporting it
+            "updated_at": GenerationJob.updated_at
+        }
+    
+    async def create(self, job: dict, owner: str, lease_seconds: float) -> None:
+        async with AsyncSessionLocal() as db:
+            lease = self._lease(owner, lease_seconds)
+            db.add(GenerationJob(**job, owner=owner, lease_expires_at=lease["lease_expires_at"]))
+            await db.commit()
+    
+    async def get(self, job_id: str) -> Optional[dict]:
+        async with AsyncSessionLocal() as db:
+            job = await db.get(GenerationJob, job_id)
+            return self._to_dict(job) if job else None
+    
+    async def update(self, job_id: str, **fields) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(GenerationJob).where(GenerationJob.id == job_id).values(**fields))
+            await db.commit()
+    
+    async def mark_section(self, job_id: str, section_id: int, status: str) -> None:
+        # Read-modify-write of the JSON column: callers must not mark
+        # sections of the same job concurrently
+        async with AsyncSessionLocal() as db:
+            job = await db.get(GenerationJob, job_id)
+            section_status = dict(job.section_status or {})
+            section_status[str(section_id)] = status
+            job.section_status = section_status
+            job.completed_sections = sum(
+                1 for value in section_status.values() if value == "completed"
+            )
+            await db.commit()
+    
+    # Claims are single UPDATE ... RETURNING statements, so when two workers
+    # race for a job the database lets exactly one of them match it
+    async def _claim_where(self, owner: str, lease_seconds: float, *conditions) -> List[tuple]:
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                update(GenerationJob)
+                .where(GenerationJob.status.in_(UNFINISHED_STATUSES), *conditions)
+                .values(**self._lease(owner, lease_seconds))
+                .returning(GenerationJob.id, GenerationJob.created_at)
+                .execution_options(synchronize_session=False)
+            )).all()
+            await db.commit()
+            return rows
+    
+    async def claim(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        rows = await self._claim_where(
+            owner, lease_seconds,
+            GenerationJob.id == job_id,
+            or_(
+                GenerationJob.owner == owner,
+                GenerationJob.owner.is_(None),
+                GenerationJob.lease_expires_at < datetime.utcnow()
+            )
+        )
+        return bool(rows)
+    
+    async def claim_expired(self, owner: str, lease_seconds: float) -> List[str]:
+        rows = await self._claim_where(
+            owner, lease_seconds,
+            or_(
+                GenerationJob.owner.is_(None),
+                # Our own jobs are queued or running here even if a slow
+                # renewal let their lease lapse
+                (GenerationJob.lease_expires_at < datetime.utcnow()) & (GenerationJob.owner != owner)
+            )
+        )
+        return [job_id for job_id, _ in sorted(rows, key=lambda row: row[1])]
+    
+    async def renew(self, owner: str, lease_seconds: float) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(GenerationJob)
+                .where(GenerationJob.owner == owner, GenerationJob.status.in_(UNFINISHED_STATUSES))
+                .values(**self._lease(owner, lease_seconds))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+    
+    async def release(self, owner: str) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(GenerationJob)
+                .where(GenerationJob.owner == owner, GenerationJob.status.in_(UNFINISHED_STATUSES))
+                .values(owner=None, lease_expires_at=None, updated_at=GenerationJob.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+def _build_backend(name: str) -> JobBackend:
+    if name == "memory":
+        return MemoryJobBackend(settings.JOB_MEMORY_TTL_SECONDS, settings.JOB_MEMORY_MAX_FINISHED)
+    if name == "database":
+        return DatabaseJobBackend()
+    raise ValueError(f"Unknown JOB_BACKEND: {name}")
+
+class JobService:
+    """Runs section generation jobs on a pool of in-process asyncio workers"""
+    
+    def __init__(self, backend: JobBackend, num_workers: int, lease_seconds: float):
+        self.backend = backend
+        self.num_workers = num_workers
+        self.lease_seconds = lease_seconds
+        # Identifies this process's leases among the app's workers
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._lease_task: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.num_workers)
+        ]
+        # Resume jobs interrupted by a restart; finished sections are skipped
+        await self._adopt_expired()
+        self._lease_task = asyncio.create_task(self._maintain_leases())
+    
+    async def stop(self):
+        tasks = self._workers + ([self._lease_task] if self._lease_task else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._lease_task = None
+        # Let another worker pick up what we were running without waiting
+        # for the leases to run out
+        try:
+            await self.backend.release(self.owner)
+        except Exception as e:
+            logger.warning("Could not release job leases", exc_info=e)
+    
+    async def _adopt_expired(self):
+        for job_id in await self.backend.claim_expired(self.owner, self.lease_seconds):
+            logger.info("Resuming generation job", extra={"job_id": job_id})
+            self._queue.put_nowait(job_id)
+    
+    async def _maintain_leases(self):
+        """Renew our leases and take over jobs from workers that stopped renewing theirs"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await self.backend.renew(self.owner, self.lease_seconds)
+                await self._adopt_expired()
+            except Exception as e:
+                logger.warning("Job lease maintenance failed", exc_info=e)
+    
+    async def submit(
+        self,
+        project_id: int,
+        user_id: int,
+        section_ids: List[int],
+        strategy: GenerationStrategy,
+        max_concurrency: Optional[int] = None,
+        use_cache: bool = True
+    ) -> dict:
+        now = datetime.utcnow()
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": JobStatus.QUEUED,
+            "strategy": strategy.value,
+            "max_concurrency": max_concurrency,
+            "use_cache": use_cache,
+            "total_sections": len(section_ids),
+            "completed_sections": 0,
+            "section_status": {str(section_id): "pending" for section_id in section_ids},
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+            "project_id": project_id,
+            "user_id": user_id
+        }
+        await self.backend.create(job, self.owner, self.lease_seconds)
+        self._queue.put_nowait(job["id"])
+        return job
+    
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await self.backend.get(job_id)
+    
+    async def watch(self, job_id: str) -> AsyncIterator[dict]:
+        """Yield the job each time its progress changes, until it finishes"""
+        last_seen = None
+        while True:
+            job = await self.backend.get(job_id)
+            if job is None:
+                return
+            snapshot = (job["status"], job["completed_sections"], job["updated_at"])
+            if snapshot != last_seen:
+                last_seen = snapshot
+                yield job
+            if job["status"] in TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(settings.JOB_EVENTS_POLL_INTERVAL)
+    
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+    
+    async def _run(self, job_id: str):
+        if not await self.backend.claim(job_id, self.owner, self.lease_seconds):
+            # Finished, or another worker took it over while it sat in our queue
+            return
+        job = await self.backend.get(job_id)
+        if job is None or job["status"] in TERMINAL_STATUSES:
+            return
+        
+        await self.backend.update(job_id, status=JobStatus.RUNNING)
+        async with AsyncSessionLocal() as db:
+            try:
+                project = (await db.execute(select(Project).where(
+                    Project.id == job["project_id"]
+                ))).scalar_one_or_none()
+                if not project:
+                    raise ValueError("Project not found")
+                
+                sections = (await db.execute(select(Section).where(
+                    Section.project_id == project.id,
+                    Section.id.in_([int(section_id) for section_id in job["section_status"]])
+                ).order_by(Section.order))).scalars().all()
+                remaining = [
+                    section for section in sections
+                    if job["section_status"].get(str(section.id)) != "completed"
+                ]
+                # Don't sit idle in a transaction while the model runs; each
+                # completion below commits in its own short transaction
+                await db.commit()
+                
+                # Sections finish concurrently but an AsyncSession is not
+                # safe for concurrent use, and mark_section rewrites the
+                # job's whole section map, so completions go through one at a time
+                commit_lock = asyncio.Lock()
+                
+                async def on_complete(index: int, content: str):
+                    section = remaining[index]
+                    async with commit_lock:
+                        section.content = content
+                        await db.commit()
+                        await self.backend.mark_section(job_id, section.id, "completed")
+                
+                await generation_service.generate_sections(
+                    main_topic=project.main_topic,
+                    document_type=project.document_type.value,
+                    section_titles=[section.title for section in remaining],
+                    strategy=GenerationStrategy(job["strategy"]),
+                    max_concurrency=job["max_concurrency"],
+                    use_cache=job["use_cache"],
+                    on_complete=on_complete,
+                    user_id=job["user_id"]
+                )
+                await self.backend.update(job_id, status=JobStatus.COMPLETED)
+            except Exception as e:
+                logger.warning("Generation job failed", exc_info=e, extra={"job_id": job_id})
+                await db.rollback()
+                await self.backend.update(job_id, status=JobStatus.FAILED, error=str(e))
+
+def job_progress(job: dict) -> dict:
+    return {
+        "id": job["id"],
+        "status": job["status"].value if isinstance(job["status"], JobStatus) else job["status"],
+        "total_sections": job["total_sections"],
+        "completed_sections": job["completed_sections"],
+        "section_status": job["section_status"],
+        "error": job["error"]
+    }
+
+job_service = JobService(
+    _build_backend(settings.JOB_BACKEND),
+    settings.JOB_WORKERS,
+    settings.JOB_LEASE_SECONDS
+)
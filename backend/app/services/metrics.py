@@ -0,0 +1,195 @@
+import time
+from typing import Iterable
+import anyio.to_thread
+from app.utils.metrics import MetricFamily, MetricsRegistry
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of the response, per router",
+    ["router", "method", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+)
+
+MODEL_REQUEST_DURATION = registry.histogram(
+    "model_request_duration_seconds",
+    "Duration of each model API call attempt, excluding time queued in the scheduler",
+    ["model", "outcome"],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+)
+MODEL_TOKENS = registry.counter(
+    "model_tokens_total",
+    "Tokens used per model; streamed calls report no usage and are estimated",
+    ["model", "type"]
+)
+MODEL_ERRORS = registry.counter(
+    "model_errors_total",
+    "Failed model call attempts by model and error class",
+    ["model", "error"]
+)
+MODEL_RETRIES = registry.counter(
+    "model_retries_total",
+    "Model call attempts repeated after a retryable failure",
+    ["model"]
+)
+MODEL_FALLBACKS = registry.counter(
+    "model_fallbacks_total",
+    "Calls that fell back to another model after the first one failed",
+    ["model", "fallback"]
+)
+
+RENDER_DURATION = registry.histogram(
+    "render_duration_seconds",
+    "Time to render an export, including time waiting for a render worker",
+    ["format"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+)
+RENDER_POOL_RESTARTS = registry.counter(
+    "render_pool_restarts_total",
+    "Render process pools replaced after a worker died"
+)
+EXPORTS = registry.counter(
+    "exports_total",
+    "Export requests that reached rendering, by format and export cache result",
+    ["format", "cache"]
+)
+
+def _router_label(scope: dict) -> str:
+    route = scope.get("route")
+    if route is None:
+        # Unmatched paths are not used as labels to keep cardinality bounded
+        return "unmatched"
+    segment = route.path.strip("/").split("/", 1)[0]
+    return segment or "root"
+
+class MetricsMiddleware:
+    """Records request latency per router.
+
+    Written as plain ASGI so streamed responses are timed until their last
+    chunk is sent, not just until the headers go out.
+    """
+    # Shared across instances so the collector can read it
+    in_progress = 0
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        status_code = 500
+        MetricsMiddleware.in_progress += 1
+        
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            MetricsMiddleware.in_progress -= 1
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                router=_router_label(scope),
+                method=scope["method"],
+                status=str(status_code)
+            )
+
+@registry.collector
+def _collect_runtime() -> Iterable[MetricFamily]:
+    # Imported here: these modules import this one for their instruments
+    from app.db.database import engine_pools
+    from app.services.ai_service import ai_service
+    from app.services.model_scheduler import model_scheduler
+    from app.services.render_executor import render_executor
+    from app.services.response_cache import response_cache
+    from app.utils import logs
+    from app.utils.security import password_hasher
+    
+    yield MetricFamily("http_requests_in_progress", "gauge", "Requests being handled").add(
+        MetricsMiddleware.in_progress
+    )
+    
+    checked_out = MetricFamily("db_pool_checked_out", "gauge", "Connections currently checked out of the pool")
+    checked_in = MetricFamily("db_pool_checked_in", "gauge", "Idle connections held by the pool")
+    pool_size = MetricFamily("db_pool_size", "gauge", "Configured connections kept in the pool")
+    overflow = MetricFamily("db_pool_overflow", "gauge", "Connections open beyond the pool size")
+    for name, pool in engine_pools().items():
+        # NullPool and friends (aiosqlite) keep no connections to report on
+        if hasattr(pool, "checkedout"):
+            checked_out.add(pool.checkedout(), engine=name)
+            checked_in.add(pool.checkedin(), engine=name)
+            pool_size.add(pool.size(), engine=name)
+            # QueuePool counts overflow from -pool_size upwards
+            overflow.add(max(0, pool.overflow()), engine=name)
+    yield checked_out
+    yield checked_in
+    yield pool_size
+    yield overflow
+    
+    # The shared AnyIO pool that runs sync routes and dependencies
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter_stats = limiter.statistics()
+    yield MetricFamily("threadpool_size", "gauge", "Threads available to sync routes").add(limiter.total_tokens)
+    yield MetricFamily("threadpool_busy", "gauge", "Threads running sync routes").add(limiter_stats.borrowed_tokens)
+    yield MetricFamily(
+        "threadpool_queue_depth", "gauge", "Sync route calls waiting for a thread"
+    ).add(limiter_stats.tasks_waiting)
+    
+    hasher = password_hasher.stats()
+    yield MetricFamily(
+        "password_hash_pending", "gauge", "Password hashes running or queued"
+    ).add(hasher["pending"])
+    yield MetricFamily(
+        "password_hash_completed_total", "counter", "Password hashes computed"
+    ).add(hasher["completed"])
+    yield MetricFamily(
+        "password_hash_rejected_total", "counter", "Password hashes refused because the queue was full"
+    ).add(hasher["rejected"])
+    yield MetricFamily(
+        "password_hash_wait_seconds_total", "counter", "Time password hashes spent queued"
+    ).add(hasher["wait_seconds_total"])
+    yield MetricFamily(
+        "password_hash_run_seconds_total", "counter", "Time spent computing password hashes"
+    ).add(hasher["run_seconds_total"])
+    
+    yield MetricFamily("render_in_flight", "gauge", "Exports rendering or queued for a render worker").add(
+        render_executor.in_flight
+    )
+    
+    cache = response_cache.stats()
+    yield MetricFamily("model_cache_hits_total", "counter", "Model responses served from cache").add(cache["hits"])
+    yield MetricFamily("model_cache_misses_total", "counter", "Model response cache misses").add(cache["misses"])
+    yield MetricFamily("model_cache_entries", "gauge", "Entries in the in-memory response cache").add(
+        cache["memory_entries"]
+    )
+    
+    scheduler = model_scheduler.stats()
+    yield MetricFamily("model_scheduler_running", "gauge", "Model calls holding a scheduler slot").add(
+        scheduler["running"]
+    )
+    yield MetricFamily("model_scheduler_queued", "gauge", "Model calls waiting for a scheduler slot").add(
+        scheduler["queued"]
+    )
+    yield MetricFamily(
+        "model_scheduler_tokens_available", "gauge", "Tokens left in the per-minute budget"
+    ).add(scheduler["tokens_available"])
+    
+    circuit = MetricFamily("model_circuit_open", "gauge", "1 while a model's circuit breaker rejects calls")
+    for model, breaker in ai_service.circuit_breakers().items():
+        circuit.add(1 if breaker.state == "open" else 0, model=model)
+    yield circuit
+    yield MetricFamily("model_api_enabled", "gauge", "1 if the last API health check succeeded").add(
+        1 if ai_service.enabled else 0
+    )
+    
+    dropped = logs.queue_handler.dropped if logs.queue_handler is not None else 0
+    yield MetricFamily(
+        "log_records_dropped_total", "counter", "Log records dropped because the log queue was full"
+    ).add(dropped)
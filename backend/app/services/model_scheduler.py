@@ -0,0 +1,206 @@
+import asyncio
+import enum
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Hashable, Optional
+from app.config import get_settings
+from app.services.ai_errors import AIServiceError
+
+settings = get_settings()
+
+class Priority(int, enum.Enum):
+    """Lower values are dispatched first"""
+    INTERACTIVE = 0
+    BULK = 1
+
+class SchedulerQueueFull(AIServiceError):
+    status_code = 429
+    
+    def __init__(self, retry_after: int):
+        super().__init__(
+            f"Too many queued model requests, retry after {retry_after}s",
+            retry_after=retry_after
+        )
+
+class Reservation:
+    """Tokens held for one model call; ``settle`` records what it actually used"""
+    
+    def __init__(self, tokens: int):
+        self.tokens = tokens
+        self.used: Optional[int] = None
+    
+    def settle(self, tokens_used: int):
+        self.used = tokens_used
+
+class _Waiter:
+    __slots__ = ("user_key", "priority", "tokens", "future", "queued")
+    
+    def __init__(self, user_key: Hashable, priority: Priority, tokens: int, future: asyncio.Future):
+        self.user_key = user_key
+        self.priority = priority
+        self.tokens = tokens
+        self.future = future
+        self.queued = True
+
+class ModelScheduler:
+    """Admission control for model calls on this worker.
+
+    Calls wait for a free slot (``max_concurrency``) and for room in a
+    tokens-per-minute bucket. Waiting calls are grouped by priority and,
+    within a priority, served round-robin across users so one user's bulk
+    generation cannot starve everyone else. A user with ``user_queue_limit``
+    calls already waiting is refused with ``SchedulerQueueFull``.
+    """
+    
+    def __init__(self, tokens_per_minute: int, max_concurrency: int, user_queue_limit: int):
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max_concurrency
+        self.user_queue_limit = user_queue_limit
+        self.running = 0
+        self._tokens = float(tokens_per_minute)
+        self._refilled_at = time.monotonic()
+        self._queues: Dict[Priority, Dict[Hashable, Deque[_Waiter]]] = {p: {} for p in Priority}
+        self._rotation: Dict[Priority, Deque[Hashable]] = {p: deque() for p in Priority}
+        self._queued: Dict[Hashable, int] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Moving average of call duration, used to estimate Retry-After
+        self._avg_duration = 1.0
+    
+    @staticmethod
+    def estimate_tokens(*texts: str, max_tokens: int = 0) -> int:
+        # Roughly four characters per token for English text
+        return sum(len(text) for text in texts) // 4 + max_tokens
+    
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            float(self.tokens_per_minute),
+            self._tokens + (now - self._refilled_at) * self.tokens_per_minute / 60
+        )
+        self._refilled_at = now
+    
+    def retry_after(self) -> int:
+        waiting = sum(self._queued.values())
+        return max(1, math.ceil(self._avg_duration * (waiting / self.max_concurrency + 1)))
+    
+    def admit(self, user_id: Optional[int]):
+        """Raise SchedulerQueueFull if ``user_id`` cannot queue another call"""
+        if user_id is not None and self._queued.get(user_id, 0) >= self.user_queue_limit:
+            raise SchedulerQueueFull(self.retry_after())
+    
+    def _enqueue(self, waiter: _Waiter):
+        queues = self._queues[waiter.priority]
+        if waiter.user_key not in queues:
+            queues[waiter.user_key] = deque()
+            self._rotation[waiter.priority].append(waiter.user_key)
+        queues[waiter.user_key].append(waiter)
+        self._queued[waiter.user_key] = self._queued.get(waiter.user_key, 0) + 1
+    
+    def _remove(self, waiter: _Waiter):
+        if not waiter.queued:
+            return
+        waiter.queued = False
+        queues = self._queues[waiter.priority]
+        queue = queues[waiter.user_key]
+        queue.remove(waiter)
+        if not queue:
+            del queues[waiter.user_key]
+            self._rotation[waiter.priority].remove(waiter.user_key)
+        self._queued[waiter.user_key] -= 1
+        if not self._queued[waiter.user_key]:
+            del self._queued[waiter.user_key]
+    
+    def _next(self) -> Optional[_Waiter]:
+        for priority in Priority:
+            rotation = self._rotation[priority]
+            if rotation:
+                return self._queues[priority][rotation[0]][0]
+        return None
+    
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        
+        while self.running < self.max_concurrency:
+            waiter = self._next()
+            if waiter is None:
+                return
+            if waiter.future.done():
+                # Cancelled while queued; its task has not cleaned up yet
+                self._remove(waiter)
+                continue
+            
+            self._refill()
+            if self._tokens < waiter.tokens:
+                delay = (waiter.tokens - self._tokens) * 60 / self.tokens_per_minute
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            
+            # Rotate the user to the back so the next grant goes to someone else
+            rotation = self._rotation[waiter.priority]
+            rotation.rotate(-1)
+            self._remove(waiter)
+            self._tokens -= waiter.tokens
+            self.running += 1
+            waiter.future.set_result(None)
+    
+    def _release(self, reservation: Reservation, started: float):
+        self._avg_duration = 0.8 * self._avg_duration + 0.2 * (time.monotonic() - started)
+        if reservation.used is not None:
+            self._refill()
+            self._tokens = min(
+                float(self.tokens_per_minute),
+                self._tokens + reservation.tokens - reservation.used
+            )
+        self.running -= 1
+        self._dispatch()
+    
+    @asynccontextmanager
+    async def slot(
+        self,
+        user_id: Optional[int],
+        priority: Priority,
+        tokens: int
+    ) -> AsyncIterator[Reservation]:
+        """Wait for a turn to call the model, holding it for the ``async with`` body"""
+        self.admit(user_id)
+        tokens = max(1, min(tokens, self.tokens_per_minute))
+        waiter = _Waiter(user_id, priority, tokens, asyncio.get_running_loop().create_future())
+        self._enqueue(waiter)
+        self._dispatch()
+        
+        reservation = Reservation(tokens)
+        started = time.monotonic()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just as the caller went away
+                self._release(reservation, started)
+            else:
+                self._remove(waiter)
+                self._dispatch()
+            raise
+        
+        started = time.monotonic()
+        try:
+            yield reservation
+        finally:
+            self._release(reservation, started)
+    
+    def stats(self) -> dict:
+        self._refill()
+        return {
+            "running": self.running,
+            "queued": sum(self._queued.values()),
+            "tokens_available": int(self._tokens)
+        }
+
+model_scheduler = ModelScheduler(
+    tokens_per_minute=settings.MODEL_TOKENS_PER_MINUTE,
+    max_concurrency=settings.MODEL_MAX_CONCURRENCY,
+    user_queue_limit=settings.MODEL_USER_QUEUE_LIMIT
+)
@@ -0,0 +1,165 @@
+import asyncio
+import gc
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from types import SimpleNamespace
+from typing import List, Optional
+from app.config import get_settings
+from app.models import Project, Section
+from app.services.metrics import RENDER_DURATION, RENDER_POOL_RESTARTS
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+class RenderQueueFull(Exception):
+    pass
+
+class RenderUnavailable(Exception):
+    """The render pool broke again right after being restarted"""
+
+def snapshot(project: Project, sections: List[Section], theme: Optional[str] = None) -> dict:
+    """Plain, picklable copy of everything the renderers read"""
+    return {
+        "theme": theme,
+        "title": project.title,
+        "main_topic": project.main_topic,
+        "sections": [
+            {"title": section.title, "order": section.order, "content": section.content or ""}
+            for section in sections
+        ]
+    }
+
+def _warm_worker():
+    # Pay the python-docx/python-pptx import cost once per worker
+    import app.services.document_service  # noqa: F401
+
+# Set in worker processes started with a memory limit
+_memory_limited = False
+
+def _init_worker(max_memory_bytes: Optional[int]):
+    global _memory_limited
+    if max_memory_bytes:
+        # A worker renders one export at a time, so this caps each export;
+        # going over raises MemoryError instead of growing until the OOM killer
+        try:
+            import resource
+        except ImportError:  # Windows
+            pass
+        else:
+            resource.setrlimit(resource.RLIMIT_AS, (max_memory_bytes, max_memory_bytes))
+            _memory_limited = True
+    _warm_worker()
+
+def _render(file_format: str, data: dict, path: str) -> int:
+    """Render straight into the file at ``path`` and return its size"""
+    from app.services.document_service import document_service
+    
+    project = SimpleNamespace(title=data["title"], main_topic=data["main_topic"])
+    sections = [SimpleNamespace(**section) for section in data["sections"]]
+    with open(path, "wb") as output:
+        if file_format == "docx":
+            document_service.create_docx(project, sections, output=output)
+        else:
+            document_service.create_pptx(project, sections, theme=data["theme"], output=output)
+    return os.path.getsize(path)
+
+def _render_in_worker(file_format: str, data: dict, path: str) -> int:
+    from lxml import etree
+    
+    try:
+        return _render(file_format, data, path)
+    except etree.LxmlError:
+        if not _memory_limited:
+            raise
+        # lxml reports failed allocations as whatever error the operation
+        # could raise (often an XPathEvalError "unknown error"), and its
+        # exceptions don't pickle back to the parent
+        raise MemoryError("Render exceeded RENDER_WORKER_MAX_MEMORY_MB") from None
+    finally:
+        # The docx/pptx package objects reference each other, so the document
+        # tree is only freed by the cycle collector; run it now instead of
+        # letting dead trees pile up between renders. Only done in worker
+        # processes, where the pause cannot hold up the event loop.
+        gc.collect()
+
+class RenderExecutor:
+    """Runs document rendering off the event loop with bounded queueing.
+
+    ``mode`` is "process" (default; scales across cores), "thread" or
+    "inline" (render in the calling thread, useful for debugging).
+    """
+    
+    def __init__(self, mode: str, max_workers: int, max_queue: int, max_memory_mb: Optional[int] = None):
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.max_memory_mb = max_memory_mb
+        self.in_flight = 0
+        self._executor: Optional[Executor] = None
+    
+    def start(self):
+        if self.mode == "process":
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.max_memory_mb * 2**20 if self.max_memory_mb else None,)
+            )
+            # Start every worker now rather than on the first export
+            for _ in range(self.max_workers):
+                self._executor.submit(_warm_worker)
+        elif self.mode == "thread":
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="render"
+            )
+        elif self.mode != "inline":
+            raise ValueError(f"Unknown RENDER_EXECUTOR: {self.mode}")
+    
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    def _restart(self, broken: Executor):
+        # Every render queued on the broken pool ends up here; only the
+        # first one replaces it
+        if self._executor is broken:
+            logger.warning("A render worker died; restarting the render pool")
+            RENDER_POOL_RESTARTS.inc()
+            self.shutdown()
+            self.start()
+    
+    async def render(self, file_format: str, data: dict, path: str) -> int:
+        """Render ``data`` into the file at ``path``; returns the file size"""
+        if self.in_flight >= self.max_workers + self.max_queue:
+            raise RenderQueueFull()
+        
+        self.in_flight += 1
+        try:
+            with RENDER_DURATION.time(format=file_format):
+                if self._executor is None:
+                    return _render(file_format, data, path)
+                render = _render_in_worker if self.mode == "process" else _render
+                loop = asyncio.get_running_loop()
+                # A worker that crashes (OOM kill, segfault, the memory cap
+                # hit in native code) breaks the whole process pool
+                for _ in range(2):
+                    executor = self._executor
+                    try:
+                        return await loop.run_in_executor(executor, render, file_format, data, path)
+                    except BrokenProcessPool:
+                        self._restart(executor)
+                raise RenderUnavailable()
+        finally:
+            self.in_flight -= 1
+
+render_executor = RenderExecutor(
+    mode=settings.RENDER_EXECUTOR,
+    max_workers=settings.RENDER_WORKERS,
+    max_queue=settings.RENDER_MAX_QUEUE,
+    max_memory_mb=settings.RENDER_WORKER_MAX_MEMORY_MB
+)
@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from app.config import get_settings
+from app.utils.cache import TTLCache
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+class SQLiteCacheTier:
+    """Persistent tier shared by all workers on a host.
+
+    Calls block on disk and on other workers' write locks, so async code
+    goes through ResponseCache, which runs them in a thread.
+    """
+    
+    # Reads record their access time here and write it back in batches
+    TOUCH_BATCH = 100
+    
+    def __init__(self, path: str, max_entries: int, ttl_seconds: int, busy_timeout: float = 1.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._touched: Dict[str, float] = {}
+        self._conn = sqlite3.connect(
+            path, timeout=busy_timeout, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses (accessed_at)"
+        )
+        self._writes = 0
+    
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                # Left for _evict; deleting here would make a miss a write
+                return None
+            self._touched[key] = now
+            if len(self._touched) >= self.TOUCH_BATCH:
+                self._flush_touched()
+            return row[0]
+    
+    def _flush_touched(self) -> None:
+        touched, self._touched = self._touched, {}
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.executemany(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in touched.items()]
+            )
+            self._conn.execute("COMMIT")
+        except sqlite3.Error:
+            self._conn.execute("ROLLBACK")
+            raise
+    
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._touched.pop(key, None)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl_seconds, now)
+            )
+            self._writes += 1
+            # Evicting on every write would turn each insert into a table scan
+            if self._writes % 100 == 0:
+                if self._touched:
+                    self._flush_touched()
+                self._evict(now)
+    
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM responses WHERE expires_at < ?", (now,))
+        self._conn.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+class ResponseCache:
+    """Content-addressed cache of model completions.
+
+    Entries are keyed on everything that determines the completion: model,
+    system message, prompt and sampling parameters.
+    """
+    
+    def __init__(
+        self,
+        enabled: bool,
+        memory: TTLCache,
+        persistent: Optional[SQLiteCacheTier] = None
+    ):
+        self.enabled = enabled
+        self.memory = memory
+        self.persistent = persistent
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(
+        model: str,
+        system_message: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        payload = json.dumps(
+            [model, system_message, prompt, temperature, max_tokens],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    async def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        value = self.memory.get(key)
+        if value is None and self.persistent is not None:
+            try:
+                value = await asyncio.to_thread(self.persistent.get, key)
+            except sqlite3.Error as e:
+                # A cache that can't be read is a cache miss, not a failed request
+                logger.warning("Persistent response cache read failed", exc_info=e)
+            if value is not None:
+                self.memory.set(key, value)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+    
+    async def set(self, key: str, value: str) -> None:
+        if not self.enabled:
+            return
+        self.memory.set(key, value)
+        if self.persistent is not None:
+            try:
+                await asyncio.to_thread(self.persistent.set, key, value)
+            except sqlite3.Error as e:
+                logger.warning("Persistent response cache write failed", exc_info=e)
+    
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_entries": len(self.memory)
+        }
+
+response_cache = ResponseCache(
+    enabled=settings.AI_CACHE_ENABLED,
+    memory=TTLCache(settings.AI_CACHE_MAX_ENTRIES, settings.AI_CACHE_TTL_SECONDS),
+    persistent=SQLiteCacheTier(
+        settings.AI_CACHE_SQLITE_PATH,
+        settings.AI_CACHE_SQLITE_MAX_ENTRIES,
+        settings.AI_CACHE_TTL_SECONDS
+    ) if settings.AI_CACHE_ENABLED and settings.AI_CACHE_SQLITE_PATH else None
+)
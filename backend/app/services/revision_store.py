@@ -0,0 +1,81 @@
+import asyncio
+from typing import Optional
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.models import RefinementHistory
+from app.utils.delta import compress_text, decompress_text, make_delta
+
+settings = get_settings()
+
+class RevisionStore:
+    """Writes refinement revisions as deltas against per-section keyframes"""
+    
+    def __init__(self, keyframe_interval: int):
+        self.keyframe_interval = max(1, keyframe_interval)
+    
+    @staticmethod
+    def encode(previous_content: str, new_content: str, keyframe_text: Optional[str] = None) -> dict:
+        """Storage columns for one revision; a keyframe when ``keyframe_text`` is None"""
+        previous_content = previous_content or ""
+        new_content = new_content or ""
+        if keyframe_text is None:
+            return {
+                "snapshot": compress_text(new_content),
+                "previous_delta": make_delta(new_content, previous_content),
+                "new_delta": None
+            }
+        return {
+            "snapshot": None,
+            "previous_delta": make_delta(keyframe_text, previous_content),
+            "new_delta": make_delta(keyframe_text, new_content)
+        }
+    
+    async def _current_keyframe(self, db: AsyncSession, section_id: int) -> Optional[RefinementHistory]:
+        latest = (await db.execute(
+            select(RefinementHistory.id, RefinementHistory.keyframe_id)
+            .where(RefinementHistory.section_id == section_id)
+            .order_by(RefinementHistory.id.desc())
+            .limit(1)
+        )).first()
+        if latest is None:
+            return None
+        
+        keyframe_id = latest.keyframe_id or latest.id
+        revisions = (await db.execute(
+            select(func.count()).select_from(RefinementHistory).where(
+                (RefinementHistory.id == keyframe_id) | (RefinementHistory.keyframe_id == keyframe_id)
+            )
+        )).scalar_one()
+        if revisions >= self.keyframe_interval:
+            return None
+        
+        return (await db.execute(
+            select(RefinementHistory).where(RefinementHistory.id == keyframe_id)
+        )).scalar_one()
+    
+    async def add(
+        self,
+        db: AsyncSession,
+        section_id: int,
+        prompt: str,
+        previous_content: str,
+        new_content: str
+    ) -> RefinementHistory:
+        """Stage a new revision on ``db``; the caller commits"""
+        keyframe = await self._current_keyframe(db, section_id)
+        keyframe_text = decompress_text(keyframe.snapshot) if keyframe else None
+        # Diffing long sections takes tens of milliseconds; keep it off the loop
+        columns = await asyncio.to_thread(self.encode, previous_content, new_content, keyframe_text)
+        
+        refinement = RefinementHistory(
+            prompt=prompt,
+            section_id=section_id,
+            keyframe=keyframe,
+            **columns
+        )
+        db.add(refinement)
+        await db.flush()
+        return refinement
+
+revision_store = RevisionStore(settings.REFINEMENT_KEYFRAME_INTERVAL)
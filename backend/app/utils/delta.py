@@ -0,0 +1,46 @@
+import json
+import re
+import zlib
+from difflib import SequenceMatcher
+from typing import List, Optional
+
+# Words with their trailing whitespace; "".join(tokens) is the original text
+_TOKEN_RE = re.compile(r"\S+\s*|\s+")
+
+def _tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text)
+
+def compress_text(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), 9)
+
+def decompress_text(data: bytes) -> str:
+    return zlib.decompress(data).decode("utf-8")
+
+def make_delta(base: str, target: str) -> bytes:
+    """Compressed edit script turning ``base`` into ``target``.
+
+    The script is a list of ``[start, end]`` token ranges copied from the base
+    and literal strings inserted between them.
+    """
+    base_tokens = _tokenize(base)
+    target_tokens = _tokenize(target)
+    ops = []
+    matcher = SequenceMatcher(None, base_tokens, target_tokens)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append("".join(target_tokens[j1:j2]))
+    return zlib.compress(json.dumps(ops, separators=(",", ":")).encode("utf-8"), 9)
+
+def apply_delta(base: str, delta: Optional[bytes]) -> str:
+    if delta is None:
+        return base
+    base_tokens = _tokenize(base)
+    parts = []
+    for op in json.loads(zlib.decompress(delta)):
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.append("".join(base_tokens[op[0]:op[1]]))
+    return "".join(parts)
@@ -0,0 +1,206 @@
+import atexit
+import contextvars
+import json
+import logging
+import queue
+import random
+import re
+import sys
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed through ``extra``.
+# uvicorn adds an ANSI-coloured copy of its messages as color_message
+_RECORD_ATTRS = set(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {
+    "message", "asctime", "request_id", "color_message"
+}
+
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, with ``extra`` fields at the top level"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        if getattr(record, "request_id", None):
+            payload["request_id"] = record.request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s")
+    
+    def format(self, record: logging.LogRecord) -> str:
+        if not hasattr(record, "request_id"):
+            record.request_id = "-"
+        return super().format(record)
+
+class ContextFilter(logging.Filter):
+    """Stamp the current request id on records before they leave the request's context"""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id_var.get()
+        return True
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of records below WARNING from the configured loggers.
+
+    ``rates`` maps logger names to the fraction kept; a rate for "app.routes"
+    also applies to "app.routes.auth".
+    """
+    
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+    
+    def _rate(self, name: str) -> Optional[float]:
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return None
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        return rate is None or random.random() < rate
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hands records to the listener thread; drops them if the queue is full
+    rather than making the request wait on stdout"""
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback here, where args and exc_info are
+        # still valid, but leave the formatting to the listener
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+    
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+def _parse_mapping(value: str) -> Dict[str, str]:
+    """``"app=DEBUG, uvicorn.access=WARNING"`` -> {"app": "DEBUG", ...}"""
+    mapping = {}
+    for item in value.split(","):
+        name, sep, setting = item.strip().partition("=")
+        if sep and name.strip():
+            mapping[name.strip()] = setting.strip()
+    return mapping
+
+_listener: Optional[QueueListener] = None
+queue_handler: Optional[NonBlockingQueueHandler] = None
+
+def configure_logging(
+    level: str = "INFO",
+    log_format: str = "json",
+    levels: str = "",
+    sample_rates: str = "",
+    queue_size: int = 10000
+):
+    """Route all logging (ours and uvicorn's) through a queue to one stdout writer"""
+    global _listener, queue_handler
+    if _listener is not None:
+        _listener.stop()
+    
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JSONFormatter() if log_format == "json" else TextFormatter())
+    
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+    rates = {name: float(rate) for name, rate in _parse_mapping(sample_rates).items()}
+    if rates:
+        queue_handler.addFilter(SamplingFilter(rates))
+    
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(level.upper())
+    
+    # uvicorn installs its own stream handlers before the app is imported
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logger = logging.getLogger(name)
+        logger.handlers = []
+        logger.propagate = True
+    
+    # httpx logs every model API request at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    for name, logger_level in _parse_mapping(levels).items():
+        logging.getLogger(name).setLevel(logger_level.upper())
+    
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+def stop_logging():
+    """Flush queued records; called on shutdown"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(stop_logging)
+
+class RequestIdMiddleware:
+    """Tag each request with an id, taken from X-Request-ID when the client
+    sends a sane one, and echo it back in the response headers"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                candidate = value.decode("latin-1")
+                if _REQUEST_ID_RE.match(candidate):
+                    request_id = candidate
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        # Exception handlers run outside this middleware, after the reset below
+        scope.setdefault("state", {})["request_id"] = request_id
+        
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-request-id", request_id.encode("latin-1"))
+                ]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(token)
@@ -0,0 +1,156 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelKey = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class MetricFamily:
+    """Samples of one metric, ready to be rendered in the text exposition format"""
+    
+    def __init__(self, name: str, kind: str, documentation: str):
+        self.name = name
+        self.kind = kind
+        self.documentation = documentation
+        self.samples: List[Tuple[str, Sequence[str], Sequence[str], float]] = []
+    
+    def add(self, value: float, **labels: str) -> "MetricFamily":
+        self.samples.append((self.name, tuple(labels), tuple(labels.values()), value))
+        return self
+    
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}"
+        ]
+        for name, label_names, label_values, value in self.samples:
+            lines.append(f"{name}{_format_labels(label_names, label_values)} {_format_value(value)}")
+        return lines
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, "counter", self.documentation)
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            family.samples.append((self.name, self.labelnames, key, value))
+        return family
+
+class Histogram:
+    """Cumulative-bucket histogram; ``buckets`` are upper bounds in seconds"""
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Per label set: [count per bucket..., sum]
+        self._values: Dict[LabelKey, List[float]] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, **labels: str):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0.0] * (len(self.buckets) + 1)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            counts[-1] += value
+    
+    @contextmanager
+    def time(self, **labels: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+    
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, "histogram", self.documentation)
+        with self._lock:
+            values = [(key, list(counts)) for key, counts in self._values.items()]
+        bucket_names = self.labelnames + ("le",)
+        for key, counts in values:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                family.samples.append(
+                    (f"{self.name}_bucket", bucket_names, key + (_format_value(bound),), cumulative)
+                )
+            family.samples.append((f"{self.name}_sum", self.labelnames, key, counts[-1]))
+            family.samples.append((f"{self.name}_count", self.labelnames, key, cumulative))
+        return family
+
+class MetricsRegistry:
+    """Metrics of this worker process.
+
+    Counters and histograms are updated as things happen; collectors are
+    called at scrape time to report gauges read from other components.
+    """
+    
+    def __init__(self):
+        self._metrics: List = []
+        self._collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+    
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, **kwargs)
+        self._metrics.append(metric)
+        return metric
+    
+    def collector(self, func: Callable[[], Iterable[MetricFamily]]):
+        self._collectors.append(func)
+        return func
+    
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.collect().render())
+        for collect in self._collectors:
+            for family in collect():
+                lines.extend(family.render())
+        return "\n".join(lines) + "\n"
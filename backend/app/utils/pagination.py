@@ -0,0 +1,48 @@
+import base64
+from datetime import datetime
+from typing import Any, List, Optional
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import InstrumentedAttribute, Query
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    raw = f"{timestamp.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        timestamp, row_id = raw.split("|")
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def keyset_paginate(
+    query: Query,
+    response: Response,
+    limit: int,
+    cursor: Optional[str],
+    sort_column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute
+) -> List[Any]:
+    """Newest-first keyset pagination; the next page's cursor is sent in X-Next-Cursor"""
+    query = query.order_by(sort_column.desc(), id_column.desc())
+    
+    if cursor:
+        timestamp, row_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            sort_column < timestamp,
+            and_(sort_column == timestamp, id_column < row_id)
+        ))
+    
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            getattr(last, sort_column.key), getattr(last, id_column.key)
+        )
+    return rows
@@ -0,0 +1,41 @@
+import os
+from typing import BinaryIO, Callable, Dict, Optional
+import anyio.to_thread
+from fastapi.responses import StreamingResponse
+
+class OpenFileResponse(StreamingResponse):
+    """Streams a file the caller already opened, with a Content-Length.
+
+    FileResponse only opens its path once the response starts sending, so
+    the file can be deleted or replaced in between. Holding the open file
+    keeps its data readable until the last chunk is out. The file is
+    closed, and ``on_close`` called, once streaming ends or is abandoned.
+    """
+    
+    chunk_size = 64 * 1024
+    
+    def __init__(
+        self,
+        file: BinaryIO,
+        media_type: str,
+        headers: Optional[Dict[str, str]] = None,
+        on_close: Optional[Callable[[], None]] = None
+    ):
+        size = os.fstat(file.fileno()).st_size
+        super().__init__(
+            self._chunks(file, on_close),
+            media_type=media_type,
+            headers={**(headers or {}), "Content-Length": str(size)}
+        )
+    
+    async def _chunks(self, file: BinaryIO, on_close: Optional[Callable[[], None]]):
+        try:
+            while True:
+                chunk = await anyio.to_thread.run_sync(file.read, self.chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            file.close()
+            if on_close is not None:
+                on_close()
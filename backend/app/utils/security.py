@@ -1,33 +1,110 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.config import get_settings
+import asyncio
 import hashlib
+import threading
+import time
 
 settings = get_settings()
 pwd_context = CryptContext(
     schemes=["bcrypt"],
     deprecated="auto",
-    bcrypt__rounds=12,
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    # Pinning min and max to the configured cost makes verify_and_update
+    # flag any hash made with a different cost for rehashing
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
     bcrypt__truncate_error=False
 )
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    # Apply same transformation as in get_password_hash
-    password_bytes = plain_password.encode('utf-8')
-    if len(password_bytes) > 72:
-        plain_password = hashlib.sha256(password_bytes).hexdigest()
-    return pwd_context.verify(plain_password, hashed_password)
+class PasswordHasherBusy(Exception):
+    pass
 
-def get_password_hash(password: str) -> str:
+class PasswordHasher:
+    """Runs bcrypt on its own small thread pool so login bursts queue here
+    instead of starving the threadpool shared by every sync route"""
+    
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.run_seconds_total = 0.0
+    
+    def _timed(self, submitted_at: float, func, *args):
+        started_at = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            finished_at = time.perf_counter()
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+                self.wait_seconds_total += started_at - submitted_at
+                self.run_seconds_total += finished_at - started_at
+    
+    async def run(self, func, *args):
+        with self._lock:
+            if self.pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise PasswordHasherBusy()
+            self.pending += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._timed, time.perf_counter(), func, *args
+        )
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "pending": self.pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "wait_seconds_total": self.wait_seconds_total,
+                "run_seconds_total": self.run_seconds_total
+            }
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
+
+def _prepare_password(password: str) -> str:
     # Bcrypt has a 72 byte limit
     # Hash the password with SHA256 first to ensure it's always under 72 bytes
     password_bytes = password.encode('utf-8')
     if len(password_bytes) > 72:
         # Use SHA256 to create a fixed-length hash
         password = hashlib.sha256(password_bytes).hexdigest()
-    return pwd_context.hash(password)
+    return password
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(_prepare_password(plain_password), hashed_password)
+
+def get_password_hash(password: str) -> str:
+    return pwd_context.hash(_prepare_password(password))
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify, returning a fresh hash as well if the stored one uses an outdated cost"""
+    return pwd_context.verify_and_update(_prepare_password(plain_password), hashed_password)
+
+async def hash_password_async(password: str) -> str:
+    return await password_hasher.run(get_password_hash, password)
+
+async def verify_and_update_password_async(
+    plain_password: str,
+    hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    return await password_hasher.run(verify_and_update_password, plain_password, hashed_password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
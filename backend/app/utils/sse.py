@@ -0,0 +1,5 @@
+import json
+
+def format_sse(data: dict, event: str = "message") -> str:
+    """Encode one Server-Sent Events frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
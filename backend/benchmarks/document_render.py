@@ -0,0 +1,245 @@
+"""Microbenchmarks for DOCX/PPTX rendering.
+
+Renders synthetic projects through the same entry point the render
+executor uses and reports, per format and project size, the wall time
+split into phases, the tracemalloc peak and the output size.
+
+    python -m benchmarks.document_render
+    python -m benchmarks.document_render --sections 1,50,500 --profiles long --formats pptx
+    python -m benchmarks.document_render --check
+    python -m benchmarks.document_render --update-thresholds
+
+``--check`` fails (exit status 1) when a case is slower or uses more memory
+than recorded in document_thresholds.json. Timings depend on the machine,
+so run ``--update-thresholds`` once on yours before relying on it.
+
+tracemalloc only sees allocations made through Python; lxml builds the XML
+trees with its own allocator, so the peak understates real memory use and
+is mainly useful for spotting growth from one run to the next.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List
+
+# app.config requires these; rendering never touches the database or OpenAI
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.services.document_service import DocumentService, DEFAULT_PPTX_THEME
+from app.services.render_executor import _render
+
+THRESHOLDS_PATH = Path(__file__).resolve().parent / "document_thresholds.json"
+
+# DocumentService helpers timed as phases, in the order they run
+PHASES = {
+    "docx": {
+        "title": "_add_docx_title",
+        "sections": "_add_docx_section",
+        "footer": "_add_docx_footer",
+        "save": "_save",
+    },
+    "pptx": {
+        "title slide": "_add_title_slide",
+        "content slides": "_add_content_slide",
+        "closing slide": "_add_end_slide",
+        "save": "_save",
+    },
+}
+
+WORDS = (
+    "the market strategy customer growth revenue platform data team quality "
+    "delivery risk roadmap adoption efficiency impact operations margin cost "
+    "supply partner region forecast pipeline investment"
+).split()
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+def _paragraph(rng: random.Random, sentences: int) -> str:
+    return " ".join(_sentence(rng, rng.randint(8, 16)) for _ in range(sentences))
+
+def _bullets(rng: random.Random, count: int) -> str:
+    return "\n".join(f"- {_sentence(rng, rng.randint(6, 12))}" for _ in range(count))
+
+def _content(rng: random.Random, profile: str, index: int) -> str:
+    if profile == "short":
+        return _paragraph(rng, 2)
+    if profile == "long":
+        blocks = [_paragraph(rng, 6) for _ in range(4)]
+        blocks.insert(2, _bullets(rng, 6))
+        return "\n\n".join(blocks)
+    # mixed: cycle through prose, bullet-only and long sections
+    kind = index % 3
+    if kind == 0:
+        return "\n\n".join(_paragraph(rng, 4) for _ in range(2))
+    if kind == 1:
+        return _bullets(rng, rng.randint(2, 6))
+    return "\n\n".join([_paragraph(rng, 6), _bullets(rng, 4), _paragraph(rng, 6)])
+
+PROFILES = ("short", "mixed", "long")
+
+def make_project(num_sections: int, profile: str, seed: int = 0) -> dict:
+    """A render_executor snapshot of a synthetic project"""
+    rng = random.Random(f"{seed}-{num_sections}-{profile}")
+    return {
+        "theme": DEFAULT_PPTX_THEME,
+        "title": "Quarterly Operations Review",
+        "main_topic": "Operational efficiency in mid-sized logistics companies",
+        "sections": [
+            {"title": f"Section {i + 1}: {_sentence(rng, 4)[:-1]}", "order": i, "content": _content(rng, profile, i)}
+            for i in range(num_sections)
+        ]
+    }
+
+@contextmanager
+def phase_timer(file_format: str):
+    """Accumulate time spent in each phase helper while the block runs"""
+    timings = {phase: 0.0 for phase in PHASES[file_format]}
+    originals = {}
+    
+    def timed(phase, function):
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                timings[phase] += time.perf_counter() - started
+        return wrapper
+    
+    for phase, name in PHASES[file_format].items():
+        originals[name] = DocumentService.__dict__[name]
+        setattr(DocumentService, name, staticmethod(timed(phase, getattr(DocumentService, name))))
+    try:
+        yield timings
+    finally:
+        for name, original in originals.items():
+            setattr(DocumentService, name, original)
+
+def measure(file_format: str, data: dict, repeat: int, path: str) -> dict:
+    runs = []
+    for _ in range(repeat):
+        with phase_timer(file_format) as timings:
+            started = time.perf_counter()
+            size = _render(file_format, data, path)
+            wall = time.perf_counter() - started
+        runs.append((wall, dict(timings)))
+    wall, timings = sorted(runs, key=lambda run: run[0])[len(runs) // 2]
+    
+    # tracemalloc slows allocation-heavy code down, so it gets its own run
+    tracemalloc.start()
+    try:
+        _render(file_format, data, path)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    
+    return {
+        "wall_ms": wall * 1000,
+        "min_ms": min(run[0] for run in runs) * 1000,
+        "stdev_ms": statistics.stdev(run[0] for run in runs) * 1000 if len(runs) > 1 else 0.0,
+        "phases_ms": {phase: seconds * 1000 for phase, seconds in timings.items()},
+        "peak_mb": peak / 2**20,
+        "output_kb": size / 1024,
+    }
+
+def case_key(file_format: str, num_sections: int, profile: str) -> str:
+    return f"{file_format}/{num_sections}/{profile}"
+
+def check(results: Dict[str, dict], thresholds: Dict[str, dict]) -> List[str]:
+    failures = []
+    for key, result in results.items():
+        limit = thresholds.get(key)
+        if limit is None:
+            continue
+        if result["wall_ms"] > limit["wall_ms"]:
+            failures.append(f"{key}: {result['wall_ms']:.1f}ms > {limit['wall_ms']:.1f}ms")
+        if result["peak_mb"] > limit["peak_mb"]:
+            failures.append(f"{key}: peak {result['peak_mb']:.1f}MB > {limit['peak_mb']:.1f}MB")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--formats", default="docx,pptx")
+    parser.add_argument("--sections", default="1,10,50,100,250,500",
+                        help="comma-separated project sizes")
+    parser.add_argument("--profiles", default="short,long",
+                        help=f"content length profiles: {', '.join(PROFILES)}")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (median is reported)")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--check", action="store_true",
+                        help=f"fail if a case exceeds {THRESHOLDS_PATH.name}")
+    parser.add_argument("--update-thresholds", action="store_true",
+                        help="record these results, times --headroom, as the thresholds")
+    parser.add_argument("--headroom", type=float, default=1.5)
+    args = parser.parse_args()
+    
+    formats = [name for name in args.formats.split(",") if name]
+    sizes = [int(size) for size in args.sections.split(",") if size]
+    profiles = [name for name in args.profiles.split(",") if name]
+    for name in profiles:
+        if name not in PROFILES:
+            parser.error(f"unknown profile: {name}")
+    
+    # Rendered files go to disk like exports do; each run overwrites the last
+    scratch = tempfile.TemporaryDirectory()
+    path = os.path.join(scratch.name, "output")
+    
+    # Import and template building are one-off costs per worker, not per export
+    started = time.perf_counter()
+    for file_format in formats:
+        _render(file_format, make_project(1, "short"), path)
+    print(f"warm-up (template build): {(time.perf_counter() - started) * 1000:.0f}ms")
+    
+    results = {}
+    with scratch:
+        for file_format in formats:
+            phases = list(PHASES[file_format])
+            print(f"\n== {file_format}")
+            print(f"  {'sections':>8} {'profile':<8}{'wall ms':>10}{'±':>7}{'peak MB':>9}{'size KB':>9}  "
+                  + "".join(f"{phase:>16}" for phase in phases))
+            for profile in profiles:
+                for num_sections in sizes:
+                    result = measure(file_format, make_project(num_sections, profile), args.repeat, path)
+                    results[case_key(file_format, num_sections, profile)] = result
+                    print(f"  {num_sections:>8} {profile:<8}{result['wall_ms']:>10.1f}{result['stdev_ms']:>7.1f}"
+                          f"{result['peak_mb']:>9.1f}{result['output_kb']:>9.0f}  "
+                          + "".join(f"{result['phases_ms'][phase]:>16.1f}" for phase in phases))
+    
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    
+    if args.update_thresholds:
+        thresholds = json.loads(THRESHOLDS_PATH.read_text()) if THRESHOLDS_PATH.exists() else {}
+        for key, result in results.items():
+            thresholds[key] = {
+                "wall_ms": round(result["wall_ms"] * args.headroom, 1),
+                "peak_mb": round(result["peak_mb"] * args.headroom, 1)
+            }
+        THRESHOLDS_PATH.write_text(json.dumps(dict(sorted(thresholds.items())), indent=2) + "\n")
+        print(f"\nThresholds written to {THRESHOLDS_PATH}")
+    
+    if args.check:
+        thresholds = json.loads(THRESHOLDS_PATH.read_text())
+        failures = check(results, thresholds)
+        unchecked = [key for key in results if key not in thresholds]
+        if unchecked:
+            print(f"\nNo threshold for: {', '.join(unchecked)}")
+        if failures:
+            print("\nThreshold exceeded:")
+            for failure in failures:
+                print(f"  {failure}")
+            sys.exit(1)
+        print("\nAll cases within thresholds")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Local stand-in for the OpenAI chat completions API.
+
+Answers /v1/models and /v1/chat/completions (streamed or not) with canned
+text after a configurable latency and token rate, and can inject 429/5xx
+errors. Used by benchmarks.load_test; it can also be run on its own and
+pointed at with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1.
+
+    python -m benchmarks.fake_openai --port 9999 --latency-ms 300 --tokens-per-second 80
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+config = {
+    "latency_ms": 300.0,
+    "jitter_ms": 100.0,
+    "tokens_per_second": 0.0,
+    "completion_tokens": 250,
+    "error_rate": 0.0,
+    "error_statuses": [429, 500],
+    "retry_after": 1.0,
+}
+
+stats = {"requests": 0, "errors": 0, "completion_tokens": 0}
+
+app = FastAPI()
+
+WORDS = (
+    "strategy market growth customer value platform data insight team process "
+    "revenue quality delivery scale risk roadmap adoption efficiency impact"
+).split()
+
+def _completion_text(prompt: str, tokens: int) -> str:
+    rng = random.Random(hash(prompt) & 0xFFFFFFFF)
+    # Outline prompts expect one title per line, slide prompts dash bullets
+    if "titles" in prompt:
+        return "\n".join(f"{rng.choice(WORDS).title()} {rng.choice(WORDS)}" for _ in range(8))
+    if "bullet" in prompt:
+        return "\n".join(
+            "- " + " ".join(rng.choice(WORDS) for _ in range(10)) for _ in range(max(1, tokens // 12))
+        )
+    sentences = []
+    for _ in range(max(1, tokens // 12)):
+        words = [rng.choice(WORDS) for _ in range(11)]
+        sentences.append(" ".join(words).capitalize() + ".")
+    paragraphs = [" ".join(sentences[i:i + 5]) for i in range(0, len(sentences), 5)]
+    return "\n\n".join(paragraphs)
+
+def _delay() -> float:
+    jitter = random.uniform(-config["jitter_ms"], config["jitter_ms"])
+    return max(0.0, config["latency_ms"] + jitter) / 1000
+
+def _injected_error():
+    if config["error_rate"] and random.random() < config["error_rate"]:
+        status = random.choice(config["error_statuses"])
+        stats["errors"] += 1
+        headers = {"retry-after": str(config["retry_after"])} if status == 429 else {}
+        return JSONResponse(
+            {"error": {"message": "Injected failure", "type": "server_error", "code": None}},
+            status_code=status,
+            headers=headers
+        )
+    return None
+
+@app.get("/v1/models")
+def list_models():
+    return {
+        "object": "list",
+        "data": [
+            {"id": model, "object": "model", "created": 0, "owned_by": "benchmark"}
+            for model in ("gpt-4", "gpt-3.5-turbo")
+        ]
+    }
+
+@app.get("/stats")
+def get_stats():
+    return stats
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    stats["requests"] += 1
+    await asyncio.sleep(_delay())
+    
+    error = _injected_error()
+    if error is not None:
+        return error
+    
+    prompt = body["messages"][-1]["content"]
+    tokens = min(body.get("max_tokens") or config["completion_tokens"], config["completion_tokens"])
+    text = _completion_text(prompt, tokens)
+    words = text.split(" ")
+    completion_tokens = len(words)
+    stats["completion_tokens"] += completion_tokens
+    per_token = 1 / config["tokens_per_second"] if config["tokens_per_second"] else 0.0
+    created = int(time.time())
+    
+    if body.get("stream"):
+        async def chunks():
+            for index, word in enumerate(words):
+                if per_token:
+                    await asyncio.sleep(per_token)
+                delta = word if index == len(words) - 1 else word + " "
+                chunk = {
+                    "id": "chatcmpl-bench", "object": "chat.completion.chunk", "created": created,
+                    "model": body["model"],
+                    "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}]
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+    
+    await asyncio.sleep(per_token * completion_tokens)
+    prompt_tokens = sum(len(message["content"]) for message in body["messages"]) // 4
+    return {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion",
+        "created": created,
+        "model": body["model"],
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": text},
+            "finish_reason": "stop"
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    }
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency-ms", type=float, default=config["latency_ms"],
+                        help="time to first token")
+    parser.add_argument("--jitter-ms", type=float, default=config["jitter_ms"])
+    parser.add_argument("--tokens-per-second", type=float, default=config["tokens_per_second"],
+                        help="generation speed after the first token (0 = instant)")
+    parser.add_argument("--completion-tokens", type=int, default=config["completion_tokens"])
+    parser.add_argument("--error-rate", type=float, default=config["error_rate"],
+                        help="fraction of completions that fail")
+    parser.add_argument("--error-statuses", default="429,500",
+                        help="comma-separated statuses to inject")
+    parser.add_argument("--retry-after", type=float, default=config["retry_after"],
+                        help="Retry-After sent with injected 429s")
+
+def configure(args: argparse.Namespace):
+    config.update(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        tokens_per_second=args.tokens_per_second,
+        completion_tokens=args.completion_tokens,
+        error_rate=args.error_rate,
+        error_statuses=[int(status) for status in args.error_statuses.split(",") if status],
+        retry_after=args.retry_after
+    )
+
+def main():
+    import uvicorn
+    
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9999)
+    add_arguments(parser)
+    args = parser.parse_args()
+    configure(args)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,512 @@
+"""End-to-end load test against a local API and a fake OpenAI server.
+
+Starts benchmarks.fake_openai and the API (through benchmarks.serve, which
+adds an event-loop lag probe) as subprocesses on free ports, backed by a
+scratch SQLite database, then drives a set of virtual users through each
+scenario and reports throughput, p50/p95/p99 latency per operation and the
+server's event-loop lag.
+
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --scenarios generate,refine --users 20 --latency-ms 800
+    python -m benchmarks.load_test --save-baseline main
+    python -m benchmarks.load_test --compare main
+
+Scenarios:
+    auth      register and log in every virtual user at once
+    crud      create, list, read, update and delete projects
+    generate  /generate/content on projects of --section-counts sections
+    refine    /refine loops on one section, reading the history back
+    export    DOCX and PPTX exports (export cache disabled so every call renders)
+
+Model token limits are raised and the export cache is turned off so the
+numbers reflect the code path rather than the quotas; pass
+``--app-env KEY=VALUE`` to run with other settings.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import httpx
+from benchmarks import fake_openai
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+
+PASSWORD = "benchmark-password"
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+def summarize(values: List[float]) -> dict:
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values, default=0.0)
+    }
+
+class Recorder:
+    """Latency samples per operation for one scenario"""
+    
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.statuses: Dict[str, Dict[int, int]] = {}
+    
+    async def call(
+        self,
+        client: httpx.AsyncClient,
+        operation: str,
+        method: str,
+        url: str,
+        expect: int = 200,
+        **kwargs
+    ) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            await response.aread()
+        except httpx.HTTPError:
+            response = None
+        elapsed = (time.perf_counter() - started) * 1000
+        
+        self.latencies.setdefault(operation, []).append(elapsed)
+        status_code = response.status_code if response is not None else 0
+        counts = self.statuses.setdefault(operation, {})
+        counts[status_code] = counts.get(status_code, 0) + 1
+        if status_code != expect:
+            self.errors[operation] = self.errors.get(operation, 0) + 1
+            return None
+        return response
+    
+    def report(self, wall_seconds: float) -> dict:
+        operations = {}
+        for operation, values in self.latencies.items():
+            operations[operation] = {
+                "requests": len(values),
+                "errors": self.errors.get(operation, 0),
+                "statuses": {str(code): count for code, count in sorted(self.statuses[operation].items())},
+                "throughput": len(values) / wall_seconds if wall_seconds else 0.0,
+                **summarize(values)
+            }
+        total = sum(len(values) for values in self.latencies.values())
+        return {
+            "wall_seconds": wall_seconds,
+            "requests": total,
+            "errors": sum(self.errors.values()),
+            "throughput": total / wall_seconds if wall_seconds else 0.0,
+            "operations": operations
+        }
+
+class VirtualUser:
+    def __init__(self, index: int, run_id: str):
+        name = f"bench-{run_id}-{index}"
+        self.email = f"{name}@example.com"
+        self.username = name
+        self.headers: Dict[str, str] = {}
+    
+    async def register(self, client: httpx.AsyncClient, recorder: Recorder) -> bool:
+        response = await recorder.call(
+            client, "register", "POST", "/auth/register", expect=201,
+            json={"email": self.email, "username": self.username, "password": PASSWORD}
+        )
+        return response is not None
+    
+    async def login(self, client: httpx.AsyncClient, recorder: Recorder) -> bool:
+        response = await recorder.call(
+            client, "login", "POST", "/auth/login",
+            json={"email": self.email, "password": PASSWORD}
+        )
+        if response is None:
+            return False
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return True
+
+def _project_payload(document_type: str, num_sections: int) -> dict:
+    return {
+        "title": f"Benchmark {document_type} {num_sections}",
+        "document_type": document_type,
+        "main_topic": "Operational efficiency in mid-sized logistics companies",
+        "sections": [
+            {"title": f"Section {i + 1}", "order": i}
+            for i in range(num_sections)
+        ]
+    }
+
+async def _create_project(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    user: VirtualUser,
+    document_type: str,
+    num_sections: int,
+    operation: str = "create project"
+) -> Optional[dict]:
+    response = await recorder.call(
+        client, operation, "POST", "/projects", expect=201,
+        headers=user.headers, json=_project_payload(document_type, num_sections)
+    )
+    return response.json() if response is not None else None
+
+async def scenario_auth(client, users, recorder, args):
+    # Fresh accounts so the register path is measured as well
+    run_id = uuid.uuid4().hex[:8]
+    
+    async def run(user: VirtualUser):
+        if await user.register(client, recorder):
+            for _ in range(args.iterations):
+                await user.login(client, recorder)
+    
+    await asyncio.gather(*(run(VirtualUser(i, run_id)) for i in range(len(users))))
+
+async def scenario_crud(client, users, recorder, args):
+    async def run(user: VirtualUser):
+        for _ in range(args.iterations):
+            project = await _create_project(client, recorder, user, "docx", 10)
+            if project is None:
+                continue
+            project_id = project["id"]
+            await recorder.call(client, "list projects", "GET", "/projects", headers=user.headers)
+            await recorder.call(client, "list project summaries", "GET", "/projects/summary", headers=user.headers)
+            await recorder.call(client, "get project", "GET", f"/projects/{project_id}", headers=user.headers)
+            await recorder.call(
+                client, "update project", "PUT", f"/projects/{project_id}",
+                headers=user.headers, json={"title": "Renamed benchmark project"}
+            )
+            await recorder.call(
+                client, "update section", "PUT", f"/sections/{project['sections'][0]['id']}",
+                headers=user.headers, json={"content": "Edited by the load test. " * 40}
+            )
+            await recorder.call(
+                client, "delete project", "DELETE", f"/projects/{project_id}",
+                expect=204, headers=user.headers
+            )
+    
+    await asyncio.gather(*(run(user) for user in users))
+
+async def scenario_generate(client, users, recorder, args):
+    async def run(user: VirtualUser, num_sections: int):
+        project = await _create_project(
+            client, recorder, user, "docx", num_sections, operation="setup: create project"
+        )
+        if project is None:
+            return
+        await recorder.call(
+            client, f"generate {num_sections} sections", "POST", "/generate/content",
+            headers=user.headers,
+            json={"project_id": project["id"], "strategy": args.strategy, "bypass_cache": True}
+        )
+    
+    for num_sections in args.section_counts:
+        await asyncio.gather(*(run(user, num_sections) for user in users))
+
+async def scenario_refine(client, users, recorder, args):
+    async def run(user: VirtualUser):
+        project = await _create_project(
+            client, recorder, user, "docx", 3, operation="setup: create project"
+        )
+        if project is None:
+            return
+        section_id = project["sections"][0]["id"]
+        await recorder.call(
+            client, "setup: update section", "PUT", f"/sections/{section_id}",
+            headers=user.headers, json={"content": "Initial draft of the section. " * 60}
+        )
+        for i in range(args.iterations):
+            await recorder.call(
+                client, "refine", "POST", "/refine", headers=user.headers,
+                json={"section_id": section_id, "prompt": f"Make it more concise ({i})", "bypass_cache": True}
+            )
+            await recorder.call(
+                client, "refinement history", "GET", f"/refine/section/{section_id}",
+                headers=user.headers, params={"limit": 20}
+            )
+    
+    await asyncio.gather(*(run(user) for user in users))
+
+async def scenario_export(client, users, recorder, args):
+    body = "\n\n".join(["Paragraph text for the export benchmark. " * 12] * 4)
+    
+    async def prepare(user: VirtualUser, document_type: str) -> Optional[int]:
+        project = await _create_project(
+            client, recorder, user, document_type, args.export_sections, operation="setup: create project"
+        )
+        if project is None:
+            return None
+        for section in project["sections"]:
+            await recorder.call(
+                client, "setup: update section", "PUT", f"/sections/{section['id']}",
+                headers=user.headers, json={"content": body}
+            )
+        return project["id"]
+    
+    async def run(user: VirtualUser):
+        docx_id = await prepare(user, "docx")
+        pptx_id = await prepare(user, "pptx")
+        for _ in range(args.iterations):
+            if docx_id is not None:
+                await recorder.call(client, "export docx", "GET", f"/export/{docx_id}/docx", headers=user.headers)
+            if pptx_id is not None:
+                await recorder.call(client, "export pptx", "GET", f"/export/{pptx_id}/pptx", headers=user.headers)
+    
+    await asyncio.gather(*(run(user) for user in users))
+
+SCENARIOS: Dict[str, Callable] = {
+    "auth": scenario_auth,
+    "crud": scenario_crud,
+    "generate": scenario_generate,
+    "refine": scenario_refine,
+    "export": scenario_export,
+}
+
+def _strip_setup(report: dict) -> dict:
+    # Setup calls are recorded so failures show up, but are not the subject
+    setup = {name: op for name, op in report["operations"].items() if name.startswith("setup: ")}
+    if not setup:
+        return report
+    report["operations"] = {name: op for name, op in report["operations"].items() if name not in setup}
+    requests = sum(op["requests"] for op in setup.values())
+    report["requests"] -= requests
+    report["errors"] -= sum(op["errors"] for op in setup.values())
+    report["throughput"] = report["requests"] / report["wall_seconds"] if report["wall_seconds"] else 0.0
+    report["setup_errors"] = sum(op["errors"] for op in setup.values())
+    return report
+
+async def _wait_ready(url: str, process: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"{url} exited with status {process.returncode}")
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready within {timeout:.0f}s")
+
+def _app_env(args, workdir: str, fake_port: int) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": f"sqlite:///{workdir}/benchmark.db",
+        "SECRET_KEY": "benchmark",
+        "OPENAI_API_KEY": "benchmark",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{fake_port}/v1",
+        "AI_CACHE_SQLITE_PATH": "",
+        "EXPORT_CACHE_ENABLED": "false",
+        "EXPORT_CACHE_DIR": f"{workdir}/exports",
+        "MODEL_TOKENS_PER_MINUTE": "100000000",
+        "MODEL_USER_QUEUE_LIMIT": "1000",
+    })
+    for item in args.app_env:
+        key, _, value = item.partition("=")
+        env[key] = value
+    return env
+
+def _fake_args(args) -> List[str]:
+    return [
+        "--latency-ms", str(args.latency_ms),
+        "--jitter-ms", str(args.jitter_ms),
+        "--tokens-per-second", str(args.tokens_per_second),
+        "--completion-tokens", str(args.completion_tokens),
+        "--error-rate", str(args.error_rate),
+        "--error-statuses", args.error_statuses,
+        "--retry-after", str(args.retry_after),
+    ]
+
+async def run_benchmark(args) -> dict:
+    fake_port, app_port = _free_port(), _free_port()
+    processes: List[subprocess.Popen] = []
+    
+    with tempfile.TemporaryDirectory(prefix="docugen-load-") as workdir:
+        log = open(os.path.join(workdir, "server.log"), "w+")
+        try:
+            fake = subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.fake_openai", "--port", str(fake_port), *_fake_args(args)],
+                cwd=BACKEND_DIR, stdout=log, stderr=subprocess.STDOUT
+            )
+            processes.append(fake)
+            await _wait_ready(f"http://127.0.0.1:{fake_port}/v1/models", fake)
+            
+            app = subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.serve", "--port", str(app_port),
+                 "--lag-interval-ms", str(args.lag_interval_ms)],
+                cwd=BACKEND_DIR, env=_app_env(args, workdir, fake_port),
+                stdout=log, stderr=subprocess.STDOUT
+            )
+            processes.append(app)
+            await _wait_ready(f"http://127.0.0.1:{app_port}/health", app)
+            
+            limits = httpx.Limits(max_connections=args.users * 2, max_keepalive_connections=args.users * 2)
+            async with httpx.AsyncClient(
+                base_url=f"http://127.0.0.1:{app_port}",
+                limits=limits,
+                timeout=args.timeout
+            ) as client:
+                run_id = uuid.uuid4().hex[:8]
+                users = [VirtualUser(i, run_id) for i in range(args.users)]
+                setup = Recorder()
+                for user in users:
+                    if not (await user.register(client, setup) and await user.login(client, setup)):
+                        raise RuntimeError("Could not create the benchmark users")
+                
+                results = {}
+                for name in args.scenarios:
+                    fake_before = (await client.get(f"http://127.0.0.1:{fake_port}/stats")).json()
+                    await client.delete("/__bench/loop-lag")
+                    recorder = Recorder()
+                    started = time.perf_counter()
+                    await SCENARIOS[name](client, users, recorder, args)
+                    wall = time.perf_counter() - started
+                    lag = (await client.get("/__bench/loop-lag")).json()["samples_ms"]
+                    fake_after = (await client.get(f"http://127.0.0.1:{fake_port}/stats")).json()
+                    
+                    report = _strip_setup(recorder.report(wall))
+                    report["loop_lag_ms"] = summarize(lag)
+                    report["model_calls"] = fake_after["requests"] - fake_before["requests"]
+                    report["model_errors"] = fake_after["errors"] - fake_before["errors"]
+                    results[name] = report
+                    print_scenario(name, report)
+        except Exception:
+            log.seek(0)
+            sys.stderr.write(log.read()[-4000:])
+            raise
+        finally:
+            for process in reversed(processes):
+                process.terminate()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+            log.close()
+    
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            "users": args.users,
+            "iterations": args.iterations,
+            "section_counts": args.section_counts,
+            "strategy": args.strategy,
+            "export_sections": args.export_sections,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "tokens_per_second": args.tokens_per_second,
+            "completion_tokens": args.completion_tokens,
+            "error_rate": args.error_rate,
+            "app_env": args.app_env,
+        },
+        "scenarios": results
+    }
+
+def print_scenario(name: str, report: dict):
+    print(f"\n== {name}: {report['requests']} requests in {report['wall_seconds']:.1f}s "
+          f"({report['throughput']:.1f} req/s), {report['errors']} errors, "
+          f"{report['model_calls']} model calls")
+    print(f"  {'operation':<28}{'n':>6}{'err':>5}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for operation, stats in report["operations"].items():
+        print(f"  {operation:<28}{stats['requests']:>6}{stats['errors']:>5}{stats['throughput']:>8.1f}"
+              f"{stats['p50']:>9.1f}{stats['p95']:>9.1f}{stats['p99']:>9.1f}")
+    lag = report["loop_lag_ms"]
+    print(f"  event loop lag: p50 {lag['p50']:.1f}ms  p99 {lag['p99']:.1f}ms  max {lag['max']:.1f}ms")
+    if report.get("setup_errors"):
+        print(f"  ({report['setup_errors']} setup requests failed)")
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Print current vs baseline and return the metrics that regressed beyond ``tolerance``"""
+    regressions = []
+    print(f"\n== compared with baseline from {baseline.get('created_at', '?')}")
+    print(f"  {'scenario / operation':<40}{'metric':>8}{'baseline':>10}{'current':>10}{'change':>9}")
+    
+    def row(label: str, metric: str, old: float, new: float, higher_is_better: bool = False):
+        change = (new - old) / old if old else 0.0
+        worse = -change if higher_is_better else change
+        flag = ""
+        if worse > tolerance:
+            flag = "  REGRESSION"
+            regressions.append(f"{label} {metric}")
+        print(f"  {label:<40}{metric:>8}{old:>10.1f}{new:>10.1f}{change:>+9.0%}{flag}")
+    
+    for name, report in current["scenarios"].items():
+        old_report = baseline.get("scenarios", {}).get(name)
+        if old_report is None:
+            continue
+        row(name, "req/s", old_report["throughput"], report["throughput"], higher_is_better=True)
+        row(name, "lag p99", old_report["loop_lag_ms"]["p99"], report["loop_lag_ms"]["p99"])
+        for operation, stats in report["operations"].items():
+            old_stats = old_report["operations"].get(operation)
+            if old_stats is None:
+                continue
+            for metric in ("p50", "p95", "p99"):
+                row(f"{name} / {operation}", metric, old_stats[metric], stats[metric])
+    return regressions
+
+def _baseline_path(name: str) -> Path:
+    path = Path(name)
+    if path.suffix == ".json" or path.parent != Path("."):
+        return path
+    return BASELINE_DIR / f"{name}.json"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"comma-separated subset of {', '.join(SCENARIOS)}")
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--iterations", type=int, default=5, help="loops per user in each scenario")
+    parser.add_argument("--section-counts", default="5,20,50",
+                        help="project sizes for the generate scenario")
+    parser.add_argument("--strategy", default="concurrent", choices=["sequential", "concurrent", "outline"])
+    parser.add_argument("--export-sections", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=300.0, help="per-request timeout in seconds")
+    parser.add_argument("--lag-interval-ms", type=float, default=10.0)
+    parser.add_argument("--app-env", action="append", default=[], metavar="KEY=VALUE",
+                        help="extra settings for the API process")
+    fake_openai.add_arguments(parser)
+    parser.add_argument("--output", help="write the full results as JSON")
+    parser.add_argument("--save-baseline", metavar="NAME",
+                        help=f"save results as a baseline (name or path; names go to {BASELINE_DIR})")
+    parser.add_argument("--compare", metavar="NAME", help="compare with a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="relative change counted as a regression when comparing")
+    args = parser.parse_args()
+    
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+    args.section_counts = [int(count) for count in args.section_counts.split(",") if count]
+    
+    results = asyncio.run(run_benchmark(args))
+    
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    if args.save_baseline:
+        path = _baseline_path(args.save_baseline)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(results, indent=2))
+        print(f"\nBaseline saved to {path}")
+    if args.compare:
+        baseline = json.loads(_baseline_path(args.compare).read_text())
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
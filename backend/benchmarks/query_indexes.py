@@ -0,0 +1,210 @@
+"""Query plans and timings for the hot lookup queries, with and without indexes.
+
+Seeds a scratch database (SQLite by default) with users, projects, sections
+and refinement history, then runs the queries the API issues on every page
+load twice: once with only the primary keys, once with the composite indexes
+declared on the models.
+
+    python -m benchmarks.query_indexes --sections 1000000
+    python -m benchmarks.query_indexes --url postgresql://... --sections 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# app.config requires these; the benchmark never talks to the API or OpenAI
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from sqlalchemy import DateTime, bindparam, create_engine, insert, text
+from app.db.database import Base
+from app.models import Project, RefinementHistory, Section, User
+from app.models.project import DocumentType
+
+INDEXES = [
+    index
+    for table in (Section.__table__, RefinementHistory.__table__, Project.__table__)
+    for index in table.indexes
+    if len(index.columns) > 1
+]
+
+SPREAD_SECONDS = 10_000_000
+
+def _random_cursor(rng: random.Random, limits: dict) -> dict:
+    # A page somewhere in the middle of a user's listing, as GET /projects sees it
+    return {
+        "user_id": rng.randint(1, limits["user_id"]),
+        "cursor_at": limits["epoch"] + timedelta(seconds=rng.randrange(SPREAD_SECONDS)),
+        "cursor_id": rng.randint(1, limits["project_id"])
+    }
+
+QUERIES = {
+    "sections by project (ORDER BY order)": (
+        'SELECT id, title, "order" FROM sections '
+        'WHERE project_id = :project_id ORDER BY "order"',
+        lambda rng, limits: {"project_id": rng.randint(1, limits["project_id"])}
+    ),
+    "refinements by section (ORDER BY created_at DESC)": (
+        "SELECT id, prompt, created_at FROM refinement_history "
+        "WHERE section_id = :section_id ORDER BY created_at DESC LIMIT 20",
+        lambda rng, limits: {"section_id": rng.randint(1, limits["section_id"])}
+    ),
+    "projects by user, keyset page (ORDER BY created_at DESC, id DESC)": (
+        # Same shape as keyset_paginate in app/utils/pagination.py
+        "SELECT id, title, created_at FROM projects "
+        "WHERE user_id = :user_id AND (created_at < :cursor_at "
+        "OR (created_at = :cursor_at AND id < :cursor_id)) "
+        "ORDER BY created_at DESC, id DESC LIMIT 21",
+        _random_cursor
+    ),
+}
+
+def statement(sql: str):
+    # Bind the cursor timestamp the way the DateTime column stores it
+    if ":cursor_at" in sql:
+        return text(sql).bindparams(bindparam("cursor_at", type_=DateTime))
+    return text(sql)
+
+def seed(engine, num_sections: int, sections_per_project: int, projects_per_user: int, batch: int):
+    num_projects = max(1, num_sections // sections_per_project)
+    num_users = max(1, num_projects // projects_per_user)
+    epoch = datetime(2024, 1, 1)
+    rng = random.Random(0)
+    
+    with engine.begin() as conn:
+        conn.execute(insert(User.__table__), [
+            {"id": user_id, "email": f"user{user_id}@example.com", "username": f"user{user_id}",
+             "hashed_password": "x", "created_at": epoch}
+            for user_id in range(1, num_users + 1)
+        ])
+        
+        rows = []
+        for project_id in range(1, num_projects + 1):
+            created_at = epoch + timedelta(seconds=rng.randrange(SPREAD_SECONDS))
+            rows.append({
+                "id": project_id, "title": f"Project {project_id}", "document_type": DocumentType.DOCX,
+                "main_topic": "Benchmark", "created_at": created_at,
+                "updated_at": created_at + timedelta(seconds=rng.randrange(SPREAD_SECONDS)),
+                # Interleave owners so a user's projects are spread across the table
+                "user_id": (project_id % num_users) + 1
+            })
+            if len(rows) >= batch:
+                conn.execute(insert(Project.__table__), rows)
+                rows = []
+        if rows:
+            conn.execute(insert(Project.__table__), rows)
+        
+        rows = []
+        refinements = []
+        for section_id in range(1, num_sections + 1):
+            project_id = (section_id % num_projects) + 1
+            rows.append({
+                "id": section_id, "title": f"Section {section_id}", "content": "",
+                "order": section_id // num_projects, "created_at": epoch, "updated_at": epoch,
+                "project_id": project_id
+            })
+            # Roughly one section in ten has been refined a few times
+            if section_id % 10 == 0:
+                for revision in range(3):
+                    refinements.append({
+                        "prompt": "Shorter",
+                        "created_at": epoch + timedelta(minutes=revision), "section_id": section_id
+                    })
+            if len(rows) >= batch:
+                conn.execute(insert(Section.__table__), rows)
+                rows = []
+            if len(refinements) >= batch:
+                conn.execute(insert(RefinementHistory.__table__), refinements)
+                refinements = []
+        if rows:
+            conn.execute(insert(Section.__table__), rows)
+        if refinements:
+            conn.execute(insert(RefinementHistory.__table__), refinements)
+    
+    return {"user_id": num_users, "project_id": num_projects, "section_id": num_sections, "epoch": epoch}
+
+def explain(conn, sql: str, params: dict) -> str:
+    if conn.dialect.name == "sqlite":
+        rows = conn.execute(statement("EXPLAIN QUERY PLAN " + sql), params).fetchall()
+        return "\n".join(f"    {row[-1]}" for row in rows)
+    rows = conn.execute(statement("EXPLAIN ANALYZE " + sql), params).fetchall()
+    return "\n".join(f"    {row[0]}" for row in rows)
+
+def measure(engine, limits: dict, repeat: int):
+    rng = random.Random(1)
+    with engine.connect() as conn:
+        for name, (sql, sample) in QUERIES.items():
+            query = statement(sql)
+            print(f"  {name}")
+            print(explain(conn, sql, sample(rng, limits)))
+            
+            timings = []
+            for _ in range(repeat):
+                params = sample(rng, limits)
+                started = time.perf_counter()
+                conn.execute(query, params).fetchall()
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            print(
+                f"    p50 {statistics.median(timings):.3f} ms  "
+                f"p95 {timings[int(len(timings) * 0.95) - 1]:.3f} ms  "
+                f"max {timings[-1]:.3f} ms  (n={repeat})"
+            )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="scratch database URL; its tables are dropped (default: a temporary SQLite file)")
+    parser.add_argument("--sections", type=int, default=1_000_000)
+    parser.add_argument("--sections-per-project", type=int, default=10)
+    parser.add_argument("--projects-per-user", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=20_000)
+    args = parser.parse_args()
+    
+    scratch = None
+    url = args.url
+    if url is None:
+        scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        scratch.close()
+        url = f"sqlite:///{scratch.name}"
+    
+    engine = create_engine(url)
+    try:
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        # Start from the pre-migration schema: primary keys only
+        for index in INDEXES:
+            index.drop(engine, checkfirst=True)
+        
+        started = time.perf_counter()
+        limits = seed(engine, args.sections, args.sections_per_project, args.projects_per_user, args.batch)
+        print(
+            f"Seeded {limits['section_id']:,} sections, {limits['project_id']:,} projects, "
+            f"{limits['user_id']:,} users in {time.perf_counter() - started:.1f}s ({engine.dialect.name})"
+        )
+        
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+        print("\nWithout indexes")
+        measure(engine, limits, args.repeat)
+        
+        started = time.perf_counter()
+        for index in INDEXES:
+            index.create(engine)
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+        print(f"\nWith indexes (built in {time.perf_counter() - started:.1f}s)")
+        measure(engine, limits, args.repeat)
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+        if scratch is not None:
+            os.unlink(scratch.name)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Run the API under uvicorn with an event-loop lag probe attached.
+
+The probe sleeps for a fixed interval on the server's own loop and records
+how late it wakes up; anything that blocks the loop (bcrypt, rendering,
+synchronous I/O) shows up as lag. benchmarks.load_test reads and resets
+the samples through GET/DELETE /__bench/loop-lag.
+
+    python -m benchmarks.serve --port 8000
+"""
+import argparse
+import asyncio
+from typing import List
+
+samples: List[float] = []
+
+async def _probe(interval: float):
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - started - interval) * 1000)
+
+def _install_routes(app):
+    @app.get("/__bench/loop-lag", include_in_schema=False)
+    def read_lag():
+        return {"samples_ms": list(samples)}
+    
+    @app.delete("/__bench/loop-lag", include_in_schema=False)
+    def reset_lag():
+        samples.clear()
+        return {"reset": True}
+
+async def _serve(host: str, port: int, interval: float):
+    import uvicorn
+    from app.main import app
+    
+    _install_routes(app)
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    probe = asyncio.create_task(_probe(interval))
+    try:
+        await server.serve()
+    finally:
+        probe.cancel()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--lag-interval-ms", type=float, default=10.0)
+    args = parser.parse_args()
+    asyncio.run(_serve(args.host, args.port, args.lag_interval_ms / 1000))
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,18 @@
 """
-Run backend with detailed error logging
+Run backend locally with readable, verbose logs
 """
+import os
 import uvicorn
-import logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Human-readable lines and DEBUG for our own code only; libraries keep INFO
+os.environ.setdefault("LOG_FORMAT", "text")
+os.environ.setdefault("LOG_LEVELS", "app=DEBUG")
 
 if __name__ == "__main__":
-    print("=" * 60)
-    print("🚀 Starting Backend with Debug Logging")
-    print("=" * 60)
-    print()
-    print("📍 Server: http://localhost:8000")
-    print("📚 API Docs: http://localhost:8000/docs")
-    print("💚 Health: http://localhost:8000/health")
-    print()
-    print("Press Ctrl+C to stop")
-    print("=" * 60)
-    print()
-    
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
         reload=True,
-        log_level="debug"
+        log_level="info"
     )
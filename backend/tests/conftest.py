@@ -0,0 +1,32 @@
+import os
+import tempfile
+import uuid
+
+import pytest
+
+# app.config requires these; OpenAI is never reached, and the database is a
+# throwaway SQLite file so both engines get real connection pools
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+@pytest.fixture
+def project():
+    """A user's project with three empty sections, as (principal, project_id)"""
+    from app.auth.dependencies import Principal
+    from app.db.database import Base, SessionLocal, engine
+    from app.models import DocumentType, Project, Section, User
+    
+    Base.metadata.create_all(bind=engine)
+    name = uuid.uuid4().hex[:8]
+    with SessionLocal() as db:
+        user = User(email=f"{name}@example.com", username=name, hashed_password="x")
+        db.add(user)
+        db.flush()
+        project = Project(title="T", document_type=DocumentType.DOCX, main_topic="Topic", user_id=user.id)
+        db.add(project)
+        db.flush()
+        db.add_all([Section(title=f"S{i}", order=i, project_id=project.id) for i in range(3)])
+        db.commit()
+        principal = Principal(id=user.id, email=user.email, username=user.username)
+        return principal, project.id
@@ -0,0 +1,67 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import ai_service as ai_service_module
+from app.services.ai_errors import AIServiceError, CircuitOpenError
+from app.services.ai_service import ai_service, settings
+from app.services.model_scheduler import ModelScheduler
+
+TOKENS_PER_MINUTE = 100_000
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    scheduler = ModelScheduler(tokens_per_minute=TOKENS_PER_MINUTE, max_concurrency=2, user_queue_limit=10)
+    monkeypatch.setattr(ai_service_module, "model_scheduler", scheduler)
+    monkeypatch.setattr(settings, "AI_RETRY_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(settings, "AI_RETRY_BASE_DELAY", 0.01)
+    return scheduler
+
+@pytest.fixture
+def client(monkeypatch):
+    calls = []
+    
+    async def create(**kwargs):
+        calls.append(kwargs)
+        raise RuntimeError("connection reset")
+    
+    monkeypatch.setattr(ai_service, "client", SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    ))
+    return calls
+
+def _complete(model: str):
+    return ai_service._chat_completion(
+        model=model, system_message="system", prompt="prompt", temperature=0.7,
+        max_tokens=2000, use_cache=False, user_id=1
+    )
+
+async def _stream(model: str):
+    async for _ in ai_service._chat_completion_stream(
+        model=model, system_message="system", prompt="prompt", temperature=0.7,
+        max_tokens=2000, use_cache=False, user_id=1
+    ):
+        pass
+
+@pytest.mark.parametrize("call", [_complete, _stream])
+def test_open_circuit_reserves_no_tokens(scheduler, client, call):
+    model = f"open-circuit-{call.__name__}"
+    ai_service._breaker(model).opened_at = time.monotonic()
+    
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(call(model))
+    
+    assert client == []
+    assert scheduler.stats() == {"running": 0, "queued": 0, "tokens_available": TOKENS_PER_MINUTE}
+
+@pytest.mark.parametrize("call", [_complete, _stream])
+def test_failed_calls_refund_their_reservation(scheduler, client, call):
+    model = f"failing-{call.__name__}"
+    
+    with pytest.raises(AIServiceError):
+        asyncio.run(call(model))
+    
+    assert len(client) == settings.AI_RETRY_MAX_ATTEMPTS
+    assert scheduler.stats() == {"running": 0, "queued": 0, "tokens_available": TOKENS_PER_MINUTE}
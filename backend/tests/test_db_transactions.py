@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.db import database
+from app.db.database import SessionLocal, get_async_engine, dispose_async_engine, AsyncSessionLocal
+from app.models import Section
+from app.models.job import JobStatus
+from app.routes.generate import generate_content
+from app.routes.refine import refine_section
+from app.schemas import GenerateContentRequest, GenerationStrategy, RefinementCreate
+from app.services.ai_service import ai_service
+from app.services.generation_service import generation_service
+from app.services.job_service import JobService, MemoryJobBackend
+
+@pytest.fixture(autouse=True)
+def async_queue_pool(monkeypatch):
+    # aiosqlite defaults to NullPool, which has nothing to count; give the
+    # async engine the same kind of pool it gets on PostgreSQL
+    pool_options = database._pool_options
+    monkeypatch.setattr(
+        database, "_pool_options",
+        lambda url, kind: {**pool_options(url, kind), "poolclass": AsyncAdaptedQueuePool}
+    )
+
+def _checked_out_while_model_runs(call, patch):
+    """Run ``call`` with the model stalled and count the async pool's checked out connections"""
+    async def scenario():
+        started = asyncio.Event()
+        release = asyncio.Event()
+        
+        async def slow_model(*args, **kwargs):
+            started.set()
+            await release.wait()
+            return kwargs
+        
+        patch(slow_model)
+        try:
+            task = asyncio.create_task(call())
+            await asyncio.wait_for(started.wait(), 5)
+            checked_out = get_async_engine().pool.checkedout()
+            release.set()
+            await task
+            return checked_out
+        finally:
+            await dispose_async_engine()
+    
+    return asyncio.run(scenario())
+
+def test_generate_content_returns_connection_during_model_call(project, monkeypatch):
+    principal, project_id = project
+    
+    def patch(slow_model):
+        async def generate_sections(**kwargs):
+            await slow_model(**kwargs)
+            return ["generated"] * len(kwargs["section_titles"])
+        monkeypatch.setattr(generation_service, "generate_sections", generate_sections)
+    
+    async def call():
+        async with AsyncSessionLocal() as db:
+            await generate_content(GenerateContentRequest(project_id=project_id), current_user=principal, db=db)
+    
+    assert _checked_out_while_model_runs(call, patch) == 0
+    with SessionLocal() as db:
+        contents = [section.content for section in db.query(Section).filter(Section.project_id == project_id)]
+    assert contents == ["generated"] * 3
+
+def test_refine_section_returns_connection_during_model_call(project, monkeypatch):
+    principal, project_id = project
+    with SessionLocal() as db:
+        section_id = db.query(Section).filter(Section.project_id == project_id).first().id
+    
+    def patch(slow_model):
+        async def refine_content(**kwargs):
+            await slow_model(**kwargs)
+            return "refined"
+        monkeypatch.setattr(ai_service, "refine_content", refine_content)
+    
+    async def call():
+        async with AsyncSessionLocal() as db:
+            await refine_section(RefinementCreate(section_id=section_id, prompt="p"), current_user=principal, db=db)
+    
+    assert _checked_out_while_model_runs(call, patch) == 0
+    with SessionLocal() as db:
+        assert db.get(Section, section_id).content == "refined"
+
+def test_job_returns_connection_during_model_call(project, monkeypatch):
+    principal, project_id = project
+    with SessionLocal() as db:
+        section_ids = [section.id for section in db.query(Section).filter(Section.project_id == project_id)]
+    service = JobService(MemoryJobBackend(ttl_seconds=60, max_finished=10), num_workers=1, lease_seconds=30)
+    
+    def patch(slow_model):
+        async def generate_sections(**kwargs):
+            await slow_model(**kwargs)
+            for index in range(len(kwargs["section_titles"])):
+                await kwargs["on_complete"](index, "generated")
+        monkeypatch.setattr(generation_service, "generate_sections", generate_sections)
+    
+    async def call():
+        service._queue = asyncio.Queue()
+        job = await service.submit(project_id, principal.id, section_ids, GenerationStrategy.SEQUENTIAL)
+        await service._run(job["id"])
+        assert (await service.get(job["id"]))["status"] == JobStatus.COMPLETED
+    
+    assert _checked_out_while_model_runs(call, patch) == 0
@@ -0,0 +1,27 @@
+from types import SimpleNamespace
+
+import pytest
+from pptx import Presentation
+
+from app.services.document_service import document_service, PPTX_THEMES
+
+def _sections():
+    contents = [
+        "Opening paragraph.\n\nA second paragraph with 40% growth data.",
+        "- First point\n- Second point\n- Third point",
+        "Intro.\n\n- One\n- Two\n\nClosing paragraph with a chart of the data.",
+        "Short section."
+    ]
+    return [
+        SimpleNamespace(title=f"Section {i + 1}", order=i, content=content)
+        for i, content in enumerate(contents)
+    ]
+
+@pytest.mark.parametrize("theme", list(PPTX_THEMES))
+def test_pptx_shape_ids_unique_per_slide(theme):
+    project = SimpleNamespace(title="Title", main_topic="Topic")
+    output = document_service.create_pptx(project, _sections(), theme=theme)
+    
+    for number, slide in enumerate(Presentation(output).slides, start=1):
+        ids = [shape.shape_id for shape in slide.shapes]
+        assert len(ids) == len(set(ids)), f"slide {number} has duplicate shape ids: {ids}"
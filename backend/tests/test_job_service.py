@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from app.db.database import AsyncSessionLocal, dispose_async_engine
+from app.models.job import JobStatus
+from app.routes.generate import submit_generation_job
+from app.schemas import GenerateContentRequest
+from app.services.generation_service import generation_service
+from app.services.job_service import DatabaseJobBackend, JobService, MemoryJobBackend
+
+@pytest.mark.parametrize("backend", [
+    lambda: MemoryJobBackend(ttl_seconds=60, max_finished=10),
+    DatabaseJobBackend
+], ids=["memory", "database"])
+@pytest.mark.parametrize("bypass_cache", [False, True])
+def test_job_passes_bypass_cache_to_generation(project, monkeypatch, backend, bypass_cache):
+    principal, project_id = project
+    service = JobService(backend(), num_workers=1, lease_seconds=30)
+    monkeypatch.setattr("app.routes.generate.job_service", service)
+    calls = []
+    
+    async def generate_sections(**kwargs):
+        calls.append(kwargs)
+        for index in range(len(kwargs["section_titles"])):
+            await kwargs["on_complete"](index, "generated")
+    
+    monkeypatch.setattr(generation_service, "generate_sections", generate_sections)
+    
+    async def scenario():
+        try:
+            service._queue = asyncio.Queue()
+            async with AsyncSessionLocal() as db:
+                job = await submit_generation_job(
+                    GenerateContentRequest(project_id=project_id, bypass_cache=bypass_cache),
+                    current_user=principal,
+                    db=db
+                )
+            await service._run(job["id"])
+            return await service.get(job["id"])
+        finally:
+            await dispose_async_engine()
+    
+    job = asyncio.run(scenario())
+    
+    assert job["status"] == JobStatus.COMPLETED
+    assert job["use_cache"] is not bypass_cache
+    assert [call["use_cache"] for call in calls] == [not bypass_cache]
@@ -43,8 +43,15 @@ export const useProjectStore = create<ProjectState>((set) => ({
   fetchProjects: async () => {
     set({ isLoading: true });
     try {
-      const response = await axiosClient.get('/projects');
-      set({ projects: response.data, isLoading: false });
+      // The API pages its listings; follow the cursor to the last page
+      const projects: Project[] = [];
+      let cursor: string | undefined;
+      do {
+        const response = await axiosClient.get('/projects', { params: { cursor } });
+        projects.push(...response.data);
+        cursor = response.headers['x-next-cursor'];
+      } while (cursor);
+      set({ projects, isLoading: false });
     } catch (error) {
       set({ isLoading: false });
       throw error;